@@ -1,80 +1,138 @@
+import time
+
+RERUN_STARTED = time.perf_counter()
+
 import datetime
 import streamlit as st
-import google.generativeai as genai
-from langgraph.graph import StateGraph
-from typing import TypedDict
 import os
 import logging
+import uuid
+import metrics
+import startup_timing
+import structured_logging
+import gemini_client
+import gazetteer
+import compatibility
+import question_cache
+import session_memory
+import session_store
+import vedic
+from chat_context import ChatContext, build_system_instruction, initial_history
+from prediction_graph import PredictionState, get_compiled_graph, STREAMING
+from singleflight import IdempotencyWindow, SingleFlight, request_key
+from resilience import Unavailable
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
+# Configure logging once per process (Streamlit re-executes this script on every interaction).
+# JSON lines to chatbot_logs.log (LOVEGURU_LOG_FILE), written and rotated by a background thread.
+@st.cache_resource(show_spinner=False)
+def get_logger():
+    structured_logging.configure()
+    logger = logging.getLogger("loveguru")
+    logger.info("🔄 Astrology chatbot server started", extra={"event": "server_start"})
+    return logger
 
-# Configure logging
-logging.basicConfig(
-    filename="chatbot_logs.log",  # Log file name
-    level=logging.INFO,  # Log level
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-)
+# Import langgraph, build and compile the prediction graph once per process
+@st.cache_resource(show_spinner=False)
+def get_graph():
+    return startup_timing.timed("import_and_compile_graph", get_compiled_graph)
+
+# Open the Gemini connection once per process, in the background
+@st.cache_resource(show_spinner=False)
+def warm_gemini():
+    gemini_client.warm_up()
+    return True
+
+# In-flight deduplication and repeated-click protection, shared by all sessions in the process
+@st.cache_resource(show_spinner=False)
+def get_singleflight():
+    return SingleFlight()
+
+@st.cache_resource(show_spinner=False)
+def get_idempotency_window():
+    return IdempotencyWindow(window_seconds=float(os.getenv("LOVEGURU_IDEMPOTENCY_WINDOW", "30")))
+
+# Prometheus-style /metrics and /traces on localhost (set LOVEGURU_METRICS_PORT to enable)
+@st.cache_resource(show_spinner=False)
+def start_metrics_server():
+    port = int(os.getenv("LOVEGURU_METRICS_PORT", "0"))
+    return metrics.serve(port) if port else None
+
+# Answers to common questions, shared by users with the same zodiac sign and numerology number
+@st.cache_resource(show_spinner=False)
+def get_question_cache():
+    return question_cache.from_env()
+
+# Where sessions outlive this process: "memory" (default, they don't: session_memory holds the only copy)
+# or "sqlite:<path>" shared by all replicas
+@st.cache_resource(show_spinner=False)
+def get_session_store():
+    return session_store.open_store(os.getenv("LOVEGURU_SESSION_STORE", "memory"))
+
+# This process's sessions: profile, prediction and chat history, within a memory budget
+@st.cache_resource(show_spinner=False)
+def get_sessions():
+    return session_memory.from_env()
 
-# Define State Schema
-class PredictionState(TypedDict):
-    name: str
-    dob: str
-    place_of_birth: str
-    zodiac_sign: str
-    numerology_number: int
-    prediction: str
-    chat_history: list
-
-# Function to calculate Zodiac Sign
-def get_zodiac(state: PredictionState) -> PredictionState:
-    dob = datetime.datetime.strptime(state["dob"], "%d-%m-%Y")
-    zodiac_dates = [
-        ("Capricorn", (12, 22), (1, 19)), ("Aquarius", (1, 20), (2, 18)),
-        ("Pisces", (2, 19), (3, 20)), ("Aries", (3, 21), (4, 19)),
-        ("Taurus", (4, 20), (5, 20)), ("Gemini", (5, 21), (6, 20)),
-        ("Cancer", (6, 21), (7, 22)), ("Leo", (7, 23), (8, 22)),
-        ("Virgo", (8, 23), (9, 22)), ("Libra", (9, 23), (10, 22)),
-        ("Scorpio", (10, 23), (11, 21)), ("Sagittarius", (11, 22), (12, 21))
-    ]
-    for sign, start, end in zodiac_dates:
-        if (dob.month == start[0] and dob.day >= start[1]) or (dob.month == end[0] and dob.day <= end[1]):
-            state["zodiac_sign"] = sign
-            break
-    return state
-
-# Function to calculate Numerology Number
-def get_numerology(state: PredictionState) -> PredictionState:
-    digits = [int(digit) for digit in state["dob"] if digit.isdigit()]
-    numerology_number = sum(digits)
-    while numerology_number > 9 and numerology_number not in [11, 22, 33]:  
-        numerology_number = sum(int(digit) for digit in str(numerology_number))
-    state["numerology_number"] = numerology_number
-    return state
-
-# Function to predict future based on Name, DOB, and Place of Birth
-def predict_relationship_future(state: PredictionState) -> PredictionState:
-    model = genai.GenerativeModel("gemini-2.0-flash-001")  # 🔥 Faster model
-    prompt = (
-        f"You are an expert astrologer. Based on name '{state['name']}', birth date '{state['dob']}', "
-        f"place of birth '{state['place_of_birth']}', Zodiac '{state['zodiac_sign']}', "
-        f"and Numerology '{state['numerology_number']}', give a **short** prediction (6-8 lines) "
-        f"focusing ONLY on **love, marriage, and relationships**. Keep your response funny and more in context of India"
-        f"try using bullet points and adding emojis wherever possible"
+# Place-of-birth choices for the form, most populous first (the box filters them as the user types)
+@st.cache_resource(show_spinner=False)
+def get_place_options():
+    try:
+        return gazetteer.get_gazetteer().labels(int(os.getenv("LOVEGURU_PLACE_OPTIONS", "5000")))
+    except (OSError, ValueError) as exc:
+        logging.getLogger("loveguru").warning(f"⚠️ Gazetteer unavailable, place of birth is free text: {exc}")
+        return []
+
+logger = get_logger()
+warm_gemini()
+start_metrics_server()
+
+# Run the prediction graph: show the precomputed preview at once, then the live reading as it
+# streams in (chunks only arrive when streaming is on), and keep the final state from "values"
+def run_prediction(initial_state, placeholder):
+    streamed = ""
+    result = initial_state
+    for mode, chunk in get_graph().stream(initial_state, stream_mode=["custom", "values"]):
+        if mode == "values":
+            result = chunk
+        elif "prediction_preview" in chunk and not streamed:
+            placeholder.markdown(f'<div class="chat-box bot-msg">{chunk["prediction_preview"]}</div>', unsafe_allow_html=True)
+        elif "prediction_chunk" in chunk:
+            streamed += chunk["prediction_chunk"]
+            placeholder.markdown(f'<div class="chat-box bot-msg">{streamed}</div>', unsafe_allow_html=True)
+    return result
+
+# Shown when Gemini is unhealthy or over quota
+DEGRADED_ANSWER = "🌫️ LoveGuru's crystal ball is buffering, beta. Ask again in a minute! 🙏"
+
+# Send one question to the session's chat, streaming the answer into `placeholder` when streaming is on
+def ask_loveguru(chat_session, question, user_name, placeholder):
+    try:
+        if not STREAMING:
+            answer = gemini_client.send_chat_text(chat_session, question)
+        else:
+            timings = {}
+            answer = ""
+            for text in gemini_client.stream_chat_text(chat_session, question, timings):
+                answer += text
+                placeholder.markdown(f'<div class="chat-box bot-msg">{answer}</div>', unsafe_allow_html=True)
+            answer = answer.strip()
+        if not answer:  # Every chunk blocked by the safety filters
+            raise Unavailable("empty reply")
+    except Unavailable as exc:
+        logger.warning(f"⚠️ Degraded answer for {user_name}: {exc}", extra={"event": "degraded", "user": user_name})
+        metrics.degraded("chat")
+        return DEGRADED_ANSWER
+    if not STREAMING:
+        return answer
+    logger.info(
+        f"⏱️ Answer for {user_name} streamed: first token {timings['first_token']:.2f}s, "
+        f"total {timings['total']:.2f}s",
+        extra={
+            "event": "answer_stream", "user": user_name,
+            "first_token_ms": round(timings["first_token"] * 1000, 1), "latency_ms": round(timings["total"] * 1000, 1),
+        },
     )
-    response = model.generate_content(prompt)
-    state["prediction"] = response.text.strip()
-    return state
-
-# Build the LangGraph
-graph = StateGraph(PredictionState)
-graph.add_node("get_zodiac", get_zodiac)
-graph.add_node("get_numerology", get_numerology)
-graph.add_node("predict_relationship_future", predict_relationship_future)
-graph.set_entry_point("get_zodiac")
-graph.add_edge("get_zodiac", "get_numerology")
-graph.add_edge("get_numerology", "predict_relationship_future")
-graph = graph.compile()
+    return answer
 
 # ========================= Streamlit UI =========================
 
@@ -116,80 +174,278 @@ st.markdown(
 st.title("🔮 Love & Marriage Chatbot")
 st.markdown("**Find out what the stars say about your love life!**")
 
-# Initialize session state for chat history and user details
-if "user_info" not in st.session_state:
-    st.session_state.user_info = None
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+# User details, prediction and chat history live in get_sessions(); st.session_state only keeps the
+# session id and per-tab UI state. The session id is kept in the URL (?sid=...), so after a restart,
+# or on another replica, the session is restored from the store.
+if "session_id" not in st.session_state:
+    restored_id = st.query_params.get("sid")
+    restored = get_sessions().get(restored_id, get_session_store().load) if restored_id else None
+    if restored and restored.user_info:
+        st.session_state.session_id = restored_id
+        logger.info("♻️ Session restored", extra={"event": "session_restored", "messages": len(restored.history)})
+    else:
+        st.session_state.session_id = uuid.uuid4().hex
+    st.query_params["sid"] = st.session_state.session_id
+
+# This rerun's session (recreated empty if it expired while the tab was idle)
+def current_session():
+    session_id = st.session_state.session_id
+    return get_sessions().get(session_id, get_session_store().load) or get_sessions().create(session_id)
+
+# True for a real DD-MM-YYYY date
+def valid_dob(text):
+    try:
+        datetime.datetime.strptime(text, "%d-%m-%Y")
+    except ValueError:
+        return False
+    return True
+
+# A place the user may have meant when what they typed isn't recognized; asked once per typed place,
+# so submitting again keeps their text as is
+def unconfirmed_place_suggestion(place_text):
+    if st.session_state.get("place_confirmed") == place_text:
+        return ""
+    st.session_state.place_confirmed = place_text
+    return gazetteer.suggest_place(place_text)
+
+session = current_session()
+if session.user_info is None:
+    for key in ("chat_session", "chat_context", "rendered_pages"):
+        st.session_state.pop(key, None)
+if "chat_context" not in st.session_state:
+    st.session_state.chat_context = ChatContext()
+if "chat_pages_shown" not in st.session_state:
+    st.session_state.chat_pages_shown = 2  # The newest page can be nearly empty, so show one more
+structured_logging.bind_session(st.session_state.session_id)
 
 # Step 1: Take User Information
-if st.session_state.user_info is None:
+if session.user_info is None:
     with st.form("user_info_form"):
         name = st.text_input("📝 Your Name", "")
-        dob = st.text_input("📅 Date of Birth (DD-MM-YYYY)", "")
-        place_of_birth = st.text_input("📍 Place of Birth", "")
+        dob = st.text_input("📅 Date of Birth (DD-MM-YYYY)", "").strip()
+        place_of_birth = st.selectbox(
+            "📍 Place of Birth", get_place_options(), index=None, accept_new_options=True,
+            placeholder="Start typing your city...",
+        )
+        time_of_birth = st.text_input("🕰️ Time of Birth (HH:MM, optional)", "").strip()
         submit = st.form_submit_button("🔮 Get My Prediction")
 
-        if submit:
-            try:
-                datetime.datetime.strptime(dob, "%d-%m-%Y")  # Validate DOB
-                st.session_state.user_info = {
-                    "name": name.strip(),
-                    "dob": dob.strip(),
-                    "place_of_birth": place_of_birth.strip(),
-                }
-                # Log user details
-                logging.info(f"👤 New user: {name}, DOB: {dob}, Place: {place_of_birth}")
-                # Run Prediction
-                initial_state = PredictionState(
-                    name=name, dob=dob, place_of_birth=place_of_birth,
-                    zodiac_sign="", numerology_number=0, prediction="", chat_history=[]
+        if submit and not valid_dob(dob):
+            st.error("⚠️ Please enter a valid date in DD-MM-YYYY format!")
+        elif submit and time_of_birth and vedic.parse_time(time_of_birth) is None:
+            st.error("⚠️ Please enter the time of birth as HH:MM (24-hour), or leave it empty!")
+        elif submit and (meant := unconfirmed_place_suggestion(place_of_birth or "")):
+            st.warning(
+                f"📍 Did you mean **{meant}**? Pick it from the list, or submit again to keep \"{place_of_birth}\"."
+            )
+        elif submit:
+            # "hazaribag", "Hazaribagh, India", ... all become "Hazaribagh, Jharkhand, India"; places the
+            # gazetteer doesn't know keep the user's text and an empty place id
+            place_of_birth, place_id = gazetteer.normalize_place(place_of_birth or "")
+            session.user_info = {
+                "name": name.strip(),
+                "dob": dob,
+                "place_of_birth": place_of_birth,
+                "place_id": place_id,
+                "time_of_birth": time_of_birth,
+            }
+            # Log user details
+            logger.info(
+                f"👤 New user: {name}",
+                extra={"event": "new_user", "user": name, "dob": dob, "place": place_of_birth, "place_id": place_id},
+            )
+            # Run Prediction
+            initial_state = PredictionState(
+                name=name, dob=dob, place_of_birth=place_of_birth, place_id=place_id,
+                time_of_birth=time_of_birth, zodiac_sign="", numerology_number=0, vedic_chart={},
+                prediction="", degraded=False, chat_history=[]
+            )
+            # A repeated click reuses this session's earlier result; identical submissions already
+            # running (in any session) share one graph run
+            submission_key = request_key(st.session_state.session_id, name, dob, place_of_birth, time_of_birth)
+            repeated, result = get_idempotency_window().seen(submission_key)
+            if not repeated:
+                with metrics.trace("prediction", session_id=st.session_state.session_id) as trace:
+                    result = get_singleflight().do(
+                        request_key("prediction", name, dob, place_of_birth, time_of_birth),
+                        run_prediction, initial_state, st.empty(),
+                    )
+                get_idempotency_window().remember(submission_key, result)
+                logger.info(
+                    f"🔮 Prediction for {name}",
+                    extra={
+                        "event": "prediction", "user": name, "latency_ms": round(trace["seconds"] * 1000, 1),
+                        "zodiac_sign": result["zodiac_sign"], "numerology_number": result["numerology_number"],
+                        "text": result["prediction"],
+                    },
                 )
-                result = graph.invoke(initial_state)
-                st.session_state.prediction = result["prediction"]
-                st.session_state.chat_history.append({"role": "bot", "text": result["prediction"]})
-                st.rerun()
-            except ValueError:
-                st.error("⚠️ Please enter a valid date in DD-MM-YYYY format!")
+            session.user_info["zodiac_sign"] = result["zodiac_sign"]
+            session.user_info["numerology_number"] = result["numerology_number"]
+            session.user_info["vedic_chart"] = result["vedic_chart"]
+            session.prediction = result["prediction"]
+            session.history.append({"role": "bot", "text": result["prediction"]})
+            get_session_store().save_profile(session.session_id, session.user_info, result["prediction"])
+            get_session_store().append_messages(session.session_id, session.history[-1:])
+            get_sessions().release(session)
+            st.rerun()
 
 # Step 2: Show Chatbot UI (After Info is Provided)
-if st.session_state.user_info:
-    user_info = st.session_state.user_info
-    st.markdown("### 🔮 Your Love & Marriage Prediction")
+
+# Messages per history page; only the newest page is shown until the user asks for earlier ones
+CHAT_PAGE_SIZE = int(os.getenv("LOVEGURU_CHAT_PAGE_SIZE", "20"))
+
+def message_html(chat):
+    role_class = "user-msg" if chat["role"] == "user" else "bot-msg"
+    return f'<div class="chat-box {role_class}">{chat["text"]}</div>'
+
+# HTML of one history page; a full page is rendered once and kept while it is on screen
+def history_page_html(history, page):
+    pages = st.session_state.setdefault("rendered_pages", {})
+    if page in pages:
+        return pages[page]
+    html = "\n".join(message_html(chat) for chat in history[page * CHAT_PAGE_SIZE:(page + 1) * CHAT_PAGE_SIZE])
+    if len(history) >= (page + 1) * CHAT_PAGE_SIZE:
+        pages[page] = html
+    return html
+
+def show_earlier_page():
+    st.session_state.chat_pages_shown += 1
+
+# One markdown block per visible page, so rendering cost doesn't grow with the conversation
+def render_history(history):
+    pages = -(-len(history) // CHAT_PAGE_SIZE)
+    first = max(0, pages - st.session_state.chat_pages_shown)
+    rendered = st.session_state.setdefault("rendered_pages", {})
+    for page in [page for page in rendered if page < first]:  # Scrolled out of view
+        del rendered[page]
+    if first > 0:
+        st.button("⬆️ Show earlier messages", key="show_earlier", on_click=show_earlier_page)
+    for page in range(first, pages):
+        st.markdown(history_page_html(history, page), unsafe_allow_html=True)
+
+# The chat area reruns on its own when the user asks something; a new turn is written below the
+# existing history in place, so neither the page nor the history is rebuilt for it
+@st.fragment
+def chat_area():
+    # A fragment rerun runs on a fresh script thread, where the main script's binding isn't set
+    structured_logging.bind_session(st.session_state.session_id)
+    session = current_session()
+    if session.user_info is None:  # Expired while the tab sat idle; start over with the form
+        st.rerun()
+    user_info = session.user_info
 
     # Chat history section
     st.markdown('<div class="chat-container">', unsafe_allow_html=True)
     st.markdown('<div class="chat-history">', unsafe_allow_html=True)
-    
-    for chat in st.session_state.chat_history:
-        role_class = "user-msg" if chat["role"] == "user" else "bot-msg"
-        st.markdown(f'<div class="chat-box {role_class}">{chat["text"]}</div>', unsafe_allow_html=True)
-
+    history_area = st.container()
+    with history_area:
+        render_history(session.history)
     st.markdown("</div>", unsafe_allow_html=True)
 
     # User input at bottom
     chat_input = st.text_input("💬 Ask about your love life...")
-    if st.button("🔍 Ask LoveGuru"):
-        if chat_input:
+    if st.button("🔍 Ask LoveGuru", key="ask_loveguru"):
+        question_key = request_key(st.session_state.session_id, chat_input)
+        if chat_input and get_idempotency_window().seen(question_key)[0]:
+            st.info("🙏 LoveGuru just answered that one, scroll up!")
+        elif chat_input:
             # Log user query
-            logging.info(f"📩 {user_info['name']} asked: {chat_input}")
-            model = genai.GenerativeModel("gemini-2.0-flash-001")  # 🔥 Fast response
-            full_prompt = (
-                f"The user {user_info['name']} was born on {user_info['dob']} in {user_info['place_of_birth']}. "
-                f"Zodiac: {st.session_state.prediction}, Numerology: {st.session_state.prediction}. "
-                f"Previous Chat History: {st.session_state.chat_history}. "
-                f"Now answer this question: {chat_input}"
-                f"Keep the answer funny as your aim is not to predict the future but to make the user laugh."
-                f"Stricly keep your tone and context as Indian"
+            logger.info(
+                f"📩 {user_info['name']} asked", extra={"event": "question", "user": user_info["name"], "text": chat_input}
             )
-            response = model.generate_content(full_prompt)
-            answer = response.text.strip()
+            # One native chat session per Streamlit session: persona/profile are sent once as the
+            # system instruction, each turn sends only the new question. A chat whose last stream was cut
+            # off (e.g. by a rerun) can't be read any more; it is rebuilt from the saved history.
+            chat_session = st.session_state.get("chat_session")
+            if chat_session is None or gemini_client.chat_history(chat_session) is None:
+                chat_session = st.session_state.chat_session = gemini_client.start_chat(
+                    build_system_instruction(user_info),
+                    initial_history(session.prediction, session.history[1:]),
+                )
+                st.session_state.chat_context = ChatContext()
+            st.session_state.chat_context.compact(chat_session)
+            question = {"role": "user", "text": chat_input}
+            with history_area:
+                st.markdown(message_html(question), unsafe_allow_html=True)
+                answer_slot = st.empty()
+            profile = (user_info["zodiac_sign"], user_info["numerology_number"])
+            with metrics.trace("chat", session_id=st.session_state.session_id) as trace:
+                answer = None
+                if question_cache.is_standalone(chat_input):
+                    answer = get_question_cache().get(*profile, chat_input, user_info["name"])
+                cached = answer is not None
+                if cached:
+                    # Keep the Gemini chat in step, so follow-up questions see this turn
+                    chat_session.history = [
+                        *chat_session.history,
+                        {"role": "user", "parts": [chat_input]},
+                        {"role": "model", "parts": [answer]},
+                    ]
+                else:
+                    answer = get_singleflight().do(
+                        question_key, ask_loveguru, chat_session, chat_input, user_info["name"], answer_slot
+                    )
+                    if answer and answer != DEGRADED_ANSWER:
+                        get_question_cache().put(*profile, chat_input, user_info, answer)
+            get_idempotency_window().remember(question_key)
             # Log bot response
-            logging.info(f"🤖 Bot replied to {user_info['name']}: {answer}")
+            logger.info(
+                f"🤖 Bot replied to {user_info['name']}",
+                extra={
+                    "event": "bot_reply", "user": user_info["name"],
+                    "latency_ms": round(trace["seconds"] * 1000, 1), "cached": cached, "text": answer,
+                },
+            )
 
-            # Save chat history
-            st.session_state.chat_history.append({"role": "user", "text": chat_input})
-            st.session_state.chat_history.append({"role": "bot", "text": answer})
-            st.rerun()
+            # Save chat history; the new turn is already on screen
+            reply = {"role": "bot", "text": answer}
+            session.history.append(question)
+            session.history.append(reply)
+            get_session_store().append_messages(session.session_id, [question, reply])
+            answer_slot.markdown(message_html(reply), unsafe_allow_html=True)
         else:
             st.warning("⚠️ Please enter a question!")
+    get_sessions().release(session)
+
+# Partner check: sign x number score matrices, plus one short blurb
+def compatibility_check(user_info):
+    with st.expander("💞 Check compatibility with a partner"):
+        with st.form("compatibility_form"):
+            partner_name = st.text_input("💑 Partner's Name", "")
+            partner_dob = st.text_input("📅 Partner's Date of Birth (DD-MM-YYYY)", "")
+            if st.form_submit_button("💞 Check Match"):
+                try:
+                    match = compatibility.compatibility(
+                        user_info["zodiac_sign"], user_info["numerology_number"], partner_dob.strip()
+                    )
+                except ValueError:
+                    st.error("⚠️ Please enter a valid date in DD-MM-YYYY format!")
+                    return
+                match["name"] = partner_name.strip() or "your partner"
+                compatibility.add_blurbs(user_info, [match], limit=1)
+                logger.info(
+                    f"💞 Compatibility for {user_info['name']}",
+                    extra={"event": "compatibility", "user": user_info["name"], "score": match["score"]},
+                )
+                st.markdown(
+                    f"**{match['name']}** ({match['zodiac_sign']}, numerology {match['numerology_number']}): "
+                    f"**{match['score']}/100**\n\n{match['blurb']}"
+                )
+
+if session.user_info:
+    st.markdown("### 🔮 Your Love & Marriage Prediction")
+    chat_area()
+    compatibility_check(session.user_info)
+get_sessions().release(session)
+
+# Startup/rerun timing report (set LOVEGURU_SHOW_TIMINGS=1 to show it in the sidebar)
+startup_timing.record_rerun(time.perf_counter() - RERUN_STARTED)
+if os.getenv("LOVEGURU_SHOW_TIMINGS") == "1":
+    with st.sidebar.expander("⏱️ Startup & rerun timings"):
+        st.json(startup_timing.report())
+        st.json({"singleflight": get_singleflight().snapshot(), "idempotency": get_idempotency_window().snapshot()})
+        st.json({"gemini_calls": gemini_client.get_policy().snapshot()})
+        st.json({"logging": structured_logging.snapshot()})
+        st.json({"question_cache": get_question_cache().snapshot()})
+        st.json({"session_store": get_session_store().snapshot()})
+        st.json({"session_memory": get_sessions().report()})
@@ -0,0 +1,101 @@
+import argparse
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+
+from astrology import NUMEROLOGY_NUMBERS, ZODIAC_SIGNS
+
+logger = logging.getLogger("loveguru")
+
+# Every reading depends only on (zodiac sign, numerology number) plus name and place,
+# so a small pool per combination covers everyone: 12 signs x 12 numbers
+
+ARCHETYPES_PATH = os.getenv("LOVEGURU_ARCHETYPES", "archetypes.json.gz")
+FORMAT_VERSION = 1
+
+
+def archetype_key(zodiac_sign, numerology_number):
+    return f"{zodiac_sign}|{int(numerology_number)}"
+
+
+# Same tone as the live prompt, with {name} and {place} left as placeholders for personalization
+def archetype_prompt(zodiac_sign, numerology_number):
+    return (
+        f"You are an expert astrologer. For a person with Zodiac '{zodiac_sign}' and Numerology "
+        f"'{numerology_number}', give a **short** prediction (6-8 lines) focusing ONLY on "
+        f"**love, marriage, and relationships**. Keep your response funny and more in context of India, "
+        f"try using bullet points and adding emojis wherever possible. Refer to the person only as "
+        f"{{name}} and to their birthplace only as {{place}}, written exactly like that with the braces."
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def load_pool(path=ARCHETYPES_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, EOFError, ValueError) as exc:  # Truncated or corrupt file: serve without the pool
+        logger.warning(f"⚠️ Ignoring unreadable {path}: {type(exc).__name__}: {exc}")
+        return {}
+    version = data.get("version") if isinstance(data, dict) else None
+    if version != FORMAT_VERSION:
+        logger.warning(f"⚠️ Ignoring {path}: format version {version}")
+        return {}
+    readings = data.get("readings")
+    if not isinstance(readings, dict):
+        logger.warning(f"⚠️ Ignoring {path}: readings are a {type(readings).__name__}, expected an object")
+        return {}
+    return readings
+
+
+# Replace the pool file atomically, so readers (and a resumed job) never see a half-written one
+def _write_pool(path, readings):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "readings": readings}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+# Pick a precomputed reading for this profile (stable per name) and fill in name and place
+def precomputed_reading(name, place_of_birth, zodiac_sign, numerology_number, path=ARCHETYPES_PATH):
+    readings = load_pool(path).get(archetype_key(zodiac_sign, numerology_number))
+    if not readings:
+        return None
+    pick = int(hashlib.md5(name.lower().encode("utf-8")).hexdigest(), 16) % len(readings)
+    return readings[pick].replace("{name}", name.strip() or "dost").replace("{place}", place_of_birth.strip() or "your city")
+
+
+# Offline job: generate `pool_size` readings for every sign x number combination.
+# Re-running keeps readings already in the file, so an interrupted job only pays for what is missing.
+def precompute(path=ARCHETYPES_PATH, pool_size=3):
+    import gemini_client
+
+    readings = dict(load_pool(path))
+    started = time.perf_counter()
+    generated = 0
+    for sign in ZODIAC_SIGNS:
+        for number in NUMEROLOGY_NUMBERS:
+            key = archetype_key(sign, number)
+            pool = readings.setdefault(key, [])
+            while len(pool) < pool_size:
+                pool.append(gemini_client.generate_text(archetype_prompt(sign, number)))
+                generated += 1
+            # Write after each combination so progress survives a crash
+            _write_pool(path, readings)
+    load_pool.cache_clear()
+    print(f"✅ {generated} readings generated in {time.perf_counter() - started:.1f}s, "
+          f"{sum(map(len, readings.values()))} total in {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute readings for every zodiac x numerology archetype")
+    parser.add_argument("--output", default=ARCHETYPES_PATH)
+    parser.add_argument("--pool-size", type=int, default=3, help="Readings per combination")
+    args = parser.parse_args()
+    precompute(args.output, args.pool_size)
@@ -0,0 +1,228 @@
+import argparse
+import datetime
+import functools
+import time
+
+# Western tropical sun signs, in the order get_zodiac has always checked them
+ZODIAC_DATES = [
+    ("Capricorn", (12, 22), (1, 19)), ("Aquarius", (1, 20), (2, 18)),
+    ("Pisces", (2, 19), (3, 20)), ("Aries", (3, 21), (4, 19)),
+    ("Taurus", (4, 20), (5, 20)), ("Gemini", (5, 21), (6, 20)),
+    ("Cancer", (6, 21), (7, 22)), ("Leo", (7, 23), (8, 22)),
+    ("Virgo", (8, 23), (9, 22)), ("Libra", (9, 23), (10, 22)),
+    ("Scorpio", (10, 23), (11, 21)), ("Sagittarius", (11, 22), (12, 21))
+]
+ZODIAC_SIGNS = [sign for sign, _, _ in ZODIAC_DATES]
+MASTER_NUMBERS = (11, 22, 33)
+NUMEROLOGY_NUMBERS = [1, 2, 3, 4, 5, 6, 7, 8, 9, *MASTER_NUMBERS]
+
+# Day slots of a leap year (so 29 Feb has one); slot = MONTH_OFFSETS[month - 1] + day - 1
+MONTH_DAYS = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+MONTH_OFFSETS = [sum(MONTH_DAYS[:month]) for month in range(12)]
+
+
+def _sign_index(month, day):
+    for index, (_, start, end) in enumerate(ZODIAC_DATES):
+        if (month == start[0] and day >= start[1]) or (month == end[0] and day <= end[1]):
+            return index
+    return -1
+
+
+# Day slot -> index into ZODIAC_SIGNS, built once from ZODIAC_DATES
+ZODIAC_BY_SLOT = bytes(
+    _sign_index(month + 1, day + 1) for month in range(12) for day in range(MONTH_DAYS[month])
+)
+
+
+def _reduce(number):
+    while number > 9 and number not in MASTER_NUMBERS:
+        number = sum(int(digit) for digit in str(number))
+    return number
+
+
+# Digit sum -> numerology number; a DD-MM-YYYY date has at most 8 digits, so sums stay below 73
+NUMEROLOGY_BY_SUM = [_reduce(total) for total in range(73)]
+
+
+def zodiac_sign(day, month):
+    return ZODIAC_SIGNS[ZODIAC_BY_SLOT[MONTH_OFFSETS[month - 1] + day - 1]]
+
+
+def numerology_number(digit_sum):
+    return NUMEROLOGY_BY_SUM[digit_sum] if digit_sum < len(NUMEROLOGY_BY_SUM) else _reduce(digit_sum)
+
+
+# Parse a DD-MM-YYYY date of birth into (day, month, year); raises ValueError if it is not a real date
+def parse_dob(dob):
+    day, month, year = (int(part) for part in dob.split("-"))
+    datetime.date(year, month, day)
+    return day, month, year
+
+
+# ========================= Batch API (numpy) =========================
+# numpy is only imported by the batch functions, the single-record path above doesn't need it
+
+
+@functools.lru_cache(maxsize=None)
+def _tables():
+    import numpy as np
+
+    return {
+        "zodiac_by_slot": np.frombuffer(ZODIAC_BY_SLOT, dtype=np.uint8),
+        "month_offsets": np.array([0, *MONTH_OFFSETS], dtype=np.int16),  # 1-based month index
+        "month_days": np.array([0, *MONTH_DAYS], dtype=np.int8),
+        "numerology_by_sum": np.array(NUMEROLOGY_BY_SUM, dtype=np.int8),
+        "signs": np.array(ZODIAC_SIGNS),
+    }
+
+
+def _digit_sum(values):
+    total = values % 10
+    values = values // 10
+    while values.any():
+        total = total + values % 10
+        values = values // 10
+    return total
+
+
+# Split dates into (day, month, year, valid) int arrays.
+# Accepts datetime64 arrays or DD-MM-YYYY strings; zero-padded strings are parsed without a Python loop.
+def parse_dobs(dobs):
+    import numpy as np
+
+    dobs = np.asarray(dobs)
+    if np.issubdtype(dobs.dtype, np.datetime64):
+        days = dobs.astype("datetime64[D]")
+        months = days.astype("datetime64[M]")
+        years = days.astype("datetime64[Y]")
+        day = (days - months).astype(np.int64) + 1
+        month = (months - years).astype(np.int64) + 1
+        year = years.astype(np.int64) + 1970
+        return day, month, year, ~np.isnat(days)
+
+    # One code unit per column: "DD-MM-YYYY" lines up as 10 columns (shorter strings are 0-padded)
+    if dobs.dtype.kind == "U":
+        chars = dobs.astype("U10").view(np.uint32).reshape(-1, 10)
+    else:
+        chars = dobs.astype("S10").view(np.uint8).reshape(-1, 10)
+    chars = chars.astype(np.int16) - ord("0")
+    dash = ord("-") - ord("0")
+    digit_columns = chars[:, [0, 1, 3, 4, 6, 7, 8, 9]]
+    padded = (chars[:, 2] == dash) & (chars[:, 5] == dash) & ((digit_columns >= 0) & (digit_columns <= 9)).all(axis=1)
+    padded &= np.char.str_len(dobs) == 10
+
+    day = chars[:, 0] * 10 + chars[:, 1]
+    month = chars[:, 3] * 10 + chars[:, 4]
+    year = chars[:, 6] * 1000 + chars[:, 7] * 100 + chars[:, 8] * 10 + chars[:, 9]
+    # Rare non-padded inputs ("1-2-2000") go through the single-record parser
+    for index in np.flatnonzero(~padded):
+        value = dobs.flat[index]
+        try:
+            day[index], month[index], year[index] = parse_dob(value.decode() if isinstance(value, bytes) else str(value))
+        except ValueError:
+            day[index], month[index], year[index] = 0, 0, 0
+
+    tables = _tables()
+    month_ok = (month >= 1) & (month <= 12)
+    safe_month = np.where(month_ok, month, 0)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    max_day = tables["month_days"][safe_month] - ((safe_month == 2) & ~leap)
+    valid = month_ok & (day >= 1) & (day <= max_day) & (year >= 1)
+    return day, month, year, valid
+
+
+# Zodiac sign index (into ZODIAC_SIGNS) per date, -1 for invalid dates
+def zodiac_indices(dobs):
+    import numpy as np
+
+    tables = _tables()
+    day, month, _, valid = parse_dobs(dobs)
+    slots = tables["month_offsets"][np.where(valid, month, 1)] + np.where(valid, day, 1) - 1
+    return np.where(valid, tables["zodiac_by_slot"][slots].astype(np.int8), -1)
+
+
+# Zodiac sign names per date ("" for invalid dates)
+def zodiac_batch(dobs):
+    import numpy as np
+
+    indices = zodiac_indices(dobs)
+    return np.where(indices >= 0, _tables()["signs"][np.maximum(indices, 0)], "")
+
+
+# Numerology number per date (digit sum of DD, MM and YYYY, then reduced), 0 for invalid dates
+def numerology_batch(dobs):
+    import numpy as np
+
+    day, month, year, valid = parse_dobs(dobs)
+    digit_sum = _digit_sum(day) + _digit_sum(month) + _digit_sum(year)
+    return np.where(valid, _tables()["numerology_by_sum"][np.minimum(digit_sum, 72)], 0)
+
+
+# ========================= Self-check and throughput =========================
+
+
+# The original per-record implementations, kept as the reference for the equivalence check
+def _reference_zodiac(dob):
+    dob = datetime.datetime.strptime(dob, "%d-%m-%Y")
+    for sign, start, end in ZODIAC_DATES:
+        if (dob.month == start[0] and dob.day >= start[1]) or (dob.month == end[0] and dob.day <= end[1]):
+            return sign
+    return ""
+
+
+def _reference_numerology(dob):
+    return _reduce(sum(int(digit) for digit in dob if digit.isdigit()))
+
+
+# Compare the tables and batch API against the reference for every calendar date in the range
+def check_equivalence(first_year=1900, last_year=2100):
+    import numpy as np
+
+    start, end = datetime.date(first_year, 1, 1), datetime.date(last_year, 12, 31)
+    dates = [start + datetime.timedelta(days=offset) for offset in range((end - start).days + 1)]
+    dobs = [date.strftime("%d-%m-%Y") for date in dates]
+    expected_signs = [_reference_zodiac(dob) for dob in dobs]
+    expected_numbers = [_reference_numerology(dob) for dob in dobs]
+
+    single_signs = [zodiac_sign(*parse_dob(dob)[:2]) for dob in dobs]
+    single_numbers = [numerology_number(sum(int(digit) for digit in dob if digit.isdigit())) for dob in dobs]
+    datetimes = np.array(dates, dtype="datetime64[D]")
+    checks = {
+        "single zodiac": single_signs == expected_signs,
+        "single numerology": single_numbers == expected_numbers,
+        "batch zodiac (strings)": zodiac_batch(dobs).tolist() == expected_signs,
+        "batch zodiac (datetime64)": zodiac_batch(datetimes).tolist() == expected_signs,
+        "batch numerology (strings)": numerology_batch(dobs).tolist() == expected_numbers,
+        "batch numerology (datetime64)": numerology_batch(datetimes).tolist() == expected_numbers,
+    }
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}: {len(dobs)} dates")
+    return all(checks.values())
+
+
+def benchmark(count=1_000_000):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    dates = np.datetime64("1900-01-01") + rng.integers(0, 73000, count).astype("timedelta64[D]")
+    day, month, year, _ = parse_dobs(dates)
+    strings = np.char.add(np.char.add(np.char.zfill(day.astype(str), 2), "-"), np.char.zfill(month.astype(str), 2))
+    strings = np.char.add(np.char.add(strings, "-"), year.astype(str))
+    for label, dobs in (("datetime64", dates), ("DD-MM-YYYY strings", strings)):
+        started = time.perf_counter()
+        zodiac_indices(dobs)
+        numerology_batch(dobs)
+        elapsed = time.perf_counter() - started
+        print(f"⚡ {label}: {count} dates classified in {elapsed:.3f}s ({count / elapsed / 1e6:.1f}M dates/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark the zodiac/numerology tables")
+    parser.add_argument("--first-year", type=int, default=1900)
+    parser.add_argument("--last-year", type=int, default=2100)
+    parser.add_argument("--benchmark", type=int, default=1_000_000, help="Dates for the throughput run (0 to skip)")
+    args = parser.parse_args()
+    ok = check_equivalence(args.first_year, args.last_year)
+    if args.benchmark:
+        benchmark(args.benchmark)
+    raise SystemExit(0 if ok else 1)
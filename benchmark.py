@@ -0,0 +1,187 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Offline benchmarks against the fake Gemini backend (no API key or network needed):
+#   python benchmark.py                                   run everything and print p50/p95/p99
+#   python benchmark.py --only graph_invoke --latency lognormal:0.8,0.4 --concurrency 32
+#   python benchmark.py --save baseline.json              record a baseline
+#   python benchmark.py --compare baseline.json           exit 1 if a p95 regressed past --tolerance
+os.environ.setdefault("LOVEGURU_GEMINI_BACKEND", "fake")
+os.environ.setdefault("LOVEGURU_GEMINI_RPM", "1000000")  # Measure the pipeline, not the rate limiter
+os.environ.setdefault("LOVEGURU_FAKE_LATENCY_DIST", "lognormal:0.05,0.3")
+os.environ.setdefault("LOVEGURU_CACHE_DB", "")  # Memory-only prediction cache; every request uses a new name
+
+import compatibility
+import fake_gemini
+from chat_context import ChatContext, build_system_instruction
+from prediction_graph import (
+    PredictionState, ainvoke_prediction, get_compiled_graph, get_numerology, get_vedic_chart, get_zodiac,
+)
+
+
+def summarize(samples, elapsed):
+    quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    return {
+        "n": len(samples),
+        "p50_ms": round(quantiles[49] * 1000, 4),
+        "p95_ms": round(quantiles[94] * 1000, 4),
+        "p99_ms": round(quantiles[98] * 1000, 4),
+        "per_second": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def _state(index, dob="22-02-2000"):
+    return PredictionState(
+        name=f"bench-{time.monotonic_ns()}-{index}", dob=dob,
+        place_of_birth="Hazaribagh, Jharkhand, India", place_id="in-jharkhand-hazaribagh", time_of_birth="",
+        zodiac_sign="", numerology_number=0, vedic_chart={}, prediction="", degraded=False, chat_history=[]
+    )
+
+
+def _time_calls(fn, states):
+    samples = []
+    started = time.perf_counter()
+    for state in states:
+        call_started = time.perf_counter()
+        fn(state)
+        samples.append(time.perf_counter() - call_started)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def bench_zodiac_node(args):
+    return _time_calls(get_zodiac, [_state(i, f"{i % 28 + 1:02d}-{i % 12 + 1:02d}-1990") for i in range(args.iterations)])
+
+
+def bench_numerology_node(args):
+    return _time_calls(get_numerology, [_state(i, f"{i % 28 + 1:02d}-{i % 12 + 1:02d}-1990") for i in range(args.iterations)])
+
+
+def bench_vedic_node(args):
+    return _time_calls(get_vedic_chart, [_state(i, f"{i % 28 + 1:02d}-{i % 12 + 1:02d}-1990") for i in range(args.iterations)])
+
+
+# One user ranked against `--candidates` random DOBs per call
+def bench_compatibility_rank(args):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    dobs = np.datetime64("1960-01-01") + rng.integers(0, 20000, args.candidates).astype("timedelta64[D]")
+    return _time_calls(lambda candidates: compatibility.top_matches("Pisces", 8, candidates, 10), [dobs] * 20)
+
+
+class _Chat:
+    def __init__(self):
+        self.history = []
+
+
+# Per-turn cost of building the chat context (system instruction + history compaction) over a long session
+def bench_chat_prompt(args):
+    user_info = {"name": "Bench", "dob": "22-02-2000", "place_of_birth": "Hazaribagh", "zodiac_sign": "Pisces", "numerology_number": 8}
+    chat, context = _Chat(), ChatContext()
+    samples = []
+    started = time.perf_counter()
+    for turn in range(args.turns):
+        call_started = time.perf_counter()
+        build_system_instruction(user_info)
+        context.compact(chat)
+        samples.append(time.perf_counter() - call_started)
+        chat.history.append({"role": "user", "parts": [f"When will I get married? (turn {turn})"]})
+        chat.history.append({"role": "model", "parts": [fake_gemini.CANNED_REPLY]})
+    return summarize(samples, time.perf_counter() - started)
+
+
+def bench_graph_invoke(args):
+    graph = get_compiled_graph()
+    fake_gemini.reset_usage()
+
+    def one(index):
+        call_started = time.perf_counter()
+        graph.invoke(_state(index))
+        return time.perf_counter() - call_started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        samples = list(pool.map(one, range(args.requests)))
+    return {**summarize(samples, time.perf_counter() - started), "tokens": dict(fake_gemini.usage)}
+
+
+def bench_graph_ainvoke(args):
+    get_compiled_graph()
+    fake_gemini.reset_usage()
+
+    async def run():
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def one(index):
+            async with slots:
+                call_started = time.perf_counter()
+                await ainvoke_prediction(_state(index))
+                return time.perf_counter() - call_started
+
+        return await asyncio.gather(*(one(index) for index in range(args.requests)))
+
+    started = time.perf_counter()
+    samples = asyncio.run(run())
+    return {**summarize(samples, time.perf_counter() - started), "tokens": dict(fake_gemini.usage)}
+
+
+BENCHMARKS = {
+    "zodiac_node": bench_zodiac_node,
+    "numerology_node": bench_numerology_node,
+    "vedic_node": bench_vedic_node,
+    "compatibility_rank": bench_compatibility_rank,
+    "chat_prompt": bench_chat_prompt,
+    "graph_invoke": bench_graph_invoke,
+    "graph_ainvoke": bench_graph_ainvoke,
+}
+
+
+# Names of benchmarks whose p95 got worse than the baseline by more than `tolerance`
+def regressions(results, baseline, tolerance):
+    return [
+        name for name, result in results.items()
+        if name in baseline and result["p95_ms"] > baseline[name]["p95_ms"] * (1 + tolerance)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline latency/throughput benchmarks for LoveGuru")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run only these (repeatable)")
+    parser.add_argument("--iterations", type=int, default=20_000, help="Calls per node benchmark")
+    parser.add_argument("--candidates", type=int, default=100_000, help="Candidate DOBs per compatibility ranking")
+    parser.add_argument("--turns", type=int, default=200, help="Chat turns for chat_prompt")
+    parser.add_argument("--requests", type=int, default=200, help="Graph runs per graph benchmark")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", help="Fake backend latency distribution, e.g. uniform:0.2,1.0")
+    parser.add_argument("--error-rate", type=float, help="Fake backend error probability")
+    parser.add_argument("--save", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON to check p95 regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown vs baseline")
+    args = parser.parse_args()
+
+    if args.latency:
+        fake_gemini.settings.latency = args.latency
+    if args.error_rate is not None:
+        fake_gemini.settings.error_rate = args.error_rate
+    results = {}
+    for name in args.only or BENCHMARKS:
+        results[name] = BENCHMARKS[name](args)
+        result = results[name]
+        print(f"{name:<16} n={result['n']:<6} p50={result['p50_ms']:>10.4f}ms p95={result['p95_ms']:>10.4f}ms "
+              f"p99={result['p99_ms']:>10.4f}ms {result['per_second']:>10.1f}/s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressed = regressions(results, json.load(f), args.tolerance)
+        if regressed:
+            print(f"❌ p95 regressed by more than {args.tolerance:.0%}: {', '.join(regressed)}")
+            raise SystemExit(1)
+        print("✅ No p95 regressions")
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import statistics
+import time
+
+from astrology import parse_dob
+from gazetteer import normalize_place
+from prediction_graph import PredictionState, ainvoke_prediction, get_compiled_graph
+from resilience import TokenBucket
+
+# Bulk readings for campaigns and partner imports:
+#   python bulk_predict.py users.csv readings.jsonl --workers 8 --rpm 60
+# Input is CSV (header row) or JSONL with name, dob (DD-MM-YYYY), place_of_birth and an optional
+# time_of_birth (HH:MM); an optional "id" column names each row, otherwise its position is used. The output JSONL doubles as the
+# checkpoint: re-running with the same output skips rows that already have an "ok" result.
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for position, row in enumerate(rows, start=1):
+            yield str(row.get("id") or position), row
+
+
+def finished_row_ids(output_path):
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:  # Torn last line from a crash
+                continue
+            if record.get("status") == "ok":
+                done.add(record["row_id"])
+    return done
+
+
+async def predict_row(row_id, row):
+    name = (row.get("name") or "").strip()
+    dob = (row.get("dob") or "").strip()
+    place_of_birth, place_id = normalize_place(row.get("place_of_birth") or "")
+    time_of_birth = (row.get("time_of_birth") or "").strip()
+    record = {
+        "row_id": row_id, "name": name, "dob": dob, "place_of_birth": place_of_birth, "place_id": place_id,
+        "time_of_birth": time_of_birth,
+    }
+    try:
+        parse_dob(dob)
+    except ValueError:  # Checked up front, so errors from the graph itself are reported as they are
+        return {**record, "status": "error", "error": "invalid date of birth, expected DD-MM-YYYY", "seconds": 0.0}
+    started = time.perf_counter()
+    try:
+        result = await ainvoke_prediction(PredictionState(
+            name=name, dob=dob, place_of_birth=place_of_birth, place_id=place_id, time_of_birth=time_of_birth,
+            zodiac_sign="", numerology_number=0, vedic_chart={}, prediction="", degraded=False, chat_history=[]
+        ))
+        record.update(
+            zodiac_sign=result["zodiac_sign"], numerology_number=result["numerology_number"],
+            vedic_chart=result["vedic_chart"],
+            prediction=result["prediction"],
+            # Fallback readings (canned or precomputed) are retried on the next run
+            status="degraded" if result.get("degraded") else "ok",
+        )
+    except Exception as exc:
+        record.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+async def run(input_path, output_path, workers, rpm):
+    get_compiled_graph()  # Build once before the workers start
+    done = finished_row_ids(output_path)
+    limiter = TokenBucket(rpm / 60, burst=max(1, workers)) if rpm else None
+    slots = asyncio.Semaphore(workers)
+    stats = {"ok": 0, "degraded": 0, "error": 0, "skipped": 0}
+    latencies = []
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def worker(row_id, row):
+            try:
+                record = await predict_row(row_id, row)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                stats[record["status"]] += 1
+                latencies.append(record["seconds"])
+            finally:
+                slots.release()
+
+        tasks = set()
+        for row_id, row in read_rows(input_path):
+            if row_id in done:
+                stats["skipped"] += 1
+                continue
+            await slots.acquire()  # Bounded concurrency, and the input is only read as fast as it is served
+            if limiter is not None:
+                await asyncio.sleep(limiter.reserve(max_wait=float("inf")))
+            task = asyncio.create_task(worker(row_id, row))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - started
+    processed = stats["ok"] + stats["degraded"] + stats["error"]
+    summary = {
+        **stats,
+        "processed": processed,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(processed / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round((stats["error"] + stats["degraded"]) / processed, 4) if processed else 0.0,
+    }
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        summary.update(p50_seconds=quantiles[49], p95_seconds=quantiles[94])
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate LoveGuru readings for a CSV/JSONL of users")
+    parser.add_argument("input", help="CSV or .jsonl with name, dob (DD-MM-YYYY), place_of_birth")
+    parser.add_argument("output", help="JSONL results, appended to and used to resume")
+    parser.add_argument("--workers", type=int, default=8, help="Predictions in flight at once")
+    parser.add_argument("--rpm", type=float, default=0, help="Rows started per minute (0 = only the Gemini client limit)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    print(json.dumps(asyncio.run(run(args.input, args.output, args.workers, args.rpm)), indent=2))
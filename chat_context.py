@@ -0,0 +1,103 @@
+import os
+
+import vedic
+
+# Rough token estimate for Gemini prompts (~4 characters per token)
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def _speaker(role):
+    return "User" if role == "user" else "LoveGuru"
+
+
+# Text and role of a chat message (SDK Content objects or plain {"role", "parts"} dicts)
+def _message_text(message):
+    parts = message["parts"] if isinstance(message, dict) else message.parts
+    return "".join(part if isinstance(part, str) else getattr(part, "text", "") for part in parts)
+
+
+def _message_role(message):
+    return message["role"] if isinstance(message, dict) else message.role
+
+
+# Shorten a message to its first sentence, capped at `limit` characters
+def _gist(text, limit):
+    text = " ".join(text.split())
+    for stop in (". ", "! ", "? ", "\n"):
+        cut = text.find(stop)
+        if 0 < cut < limit:
+            return text[: cut + 1]
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+# Persona and user profile, sent once per chat session as the system instruction
+def build_system_instruction(user_info):
+    return (
+        f"You are LoveGuru, a funny Indian astrologer chatting about love, marriage and relationships. "
+        f"The user {user_info['name']} was born on {user_info['dob']} in {user_info['place_of_birth']}. "
+        f"Zodiac: {user_info.get('zodiac_sign', '')}, Numerology: {user_info.get('numerology_number', '')}. "
+        + (f"Vedic chart: {vedic.describe_chart(user_info['vedic_chart'])}. " if user_info.get("vedic_chart") else "")
+        + "Keep the answer funny as your aim is not to predict the future but to make the user laugh. "
+        "Stricly keep your tone and context as Indian"
+    )
+
+
+# Opening history of a chat session: the initial prediction as the model's first reply, followed by
+# any earlier chat messages ({"role": "user" | "bot", "text"}) of a restored session
+def initial_history(prediction, turns=()):
+    return [
+        {"role": "user", "parts": ["What do the stars say about my love life?"]},
+        {"role": "model", "parts": [prediction]},
+        *({"role": "user" if turn["role"] == "user" else "model", "parts": [turn["text"]]} for turn in turns),
+    ]
+
+
+# Keeps the last few messages of a chat session verbatim and folds older ones into a rolling summary.
+# Folding is incremental: each message is summarized once, when it leaves the recent window,
+# so the history resent with every turn stays within the token budget however long the chat runs.
+class ChatContext:
+    SUMMARY_PREFIX = "Summary of the earlier chat:\n"
+
+    def __init__(self, recent_turns=None, token_budget=None, gist_chars=160):
+        recent_turns = recent_turns or int(os.getenv("LOVEGURU_CHAT_RECENT_TURNS", "6"))
+        self.recent_turns = max(2, recent_turns - recent_turns % 2)  # Whole user/model pairs
+        self.token_budget = token_budget or int(os.getenv("LOVEGURU_CHAT_TOKEN_BUDGET", "1200"))
+        self.gist_chars = gist_chars
+        self.summary_lines = []
+
+    def _fold(self, messages):
+        for message in messages:
+            gist = _gist(_message_text(message), self.gist_chars)
+            self.summary_lines.append(f"{_speaker(_message_role(message))}: {gist}")
+
+    def _tokens(self, messages):
+        return estimate_tokens("\n".join(self.summary_lines + [_message_text(m) for m in messages]))
+
+    # Trim a chat session's history in place before the next message is sent
+    def compact(self, chat):
+        history = list(chat.history)
+        if history and _message_text(history[0]).startswith(self.SUMMARY_PREFIX):
+            history = history[2:]  # Drop the previous summary pair, its lines are in summary_lines
+
+        keep = self.recent_turns
+        if len(history) <= keep and not self.summary_lines:
+            return
+        self._fold(history[:-keep] if len(history) > keep else [])
+        recent = history[-keep:]
+
+        # Recent turns win over the summary; fold the oldest pair while over budget
+        while len(recent) > 2 and self._tokens(recent) > self.token_budget:
+            self._fold(recent[:2])
+            recent = recent[2:]
+        # Then drop the oldest summary lines (they were already condensed once)
+        while self.summary_lines and self._tokens(recent) > self.token_budget:
+            self.summary_lines.pop(0)
+
+        summary = []
+        if self.summary_lines:
+            summary = [
+                {"role": "user", "parts": [self.SUMMARY_PREFIX + "\n".join(self.summary_lines)]},
+                {"role": "model", "parts": ["Noted! 🙏"]},
+            ]
+        chat.history = summary + recent
@@ -0,0 +1,219 @@
+import argparse
+import csv
+import functools
+import json
+import logging
+import time
+
+import gemini_client
+import metrics
+from astrology import (
+    NUMEROLOGY_NUMBERS, ZODIAC_SIGNS, numerology_batch, numerology_number, parse_dob, zodiac_indices, zodiac_sign,
+)
+from micro_batch import parse_batch_reply
+
+logger = logging.getLogger("loveguru")
+
+# Partner compatibility from the same zodiac sign and numerology number get_zodiac / get_numerology give.
+# Pair scores (0-100) are precomputed as sign x sign and number x number matrices, so scoring one user
+# against many candidate DOBs is two array lookups; only the final top few get an LLM blurb.
+#   python compatibility.py --dob 22-02-2000 --candidates partners.csv --top 10 --blurbs 3
+#   python compatibility.py --dob 22-02-2000 --random 1000000            (throughput run)
+
+SIGN_WEIGHT = 0.6  # Share of the sign score in the total, the rest is numerology
+
+# Sign pair score by distance around the zodiac wheel (0 = same sign ... 6 = opposite signs):
+# trines share an element, sextiles and oppositions complement each other, squares clash
+SCORE_BY_ASPECT = [70, 45, 75, 40, 95, 35, 80]
+
+# Numbers in the same group get along; master numbers pair like their root (11 -> 2, 22 -> 4, 33 -> 6)
+NUMBER_GROUPS = [(1, 5, 7), (2, 4, 8), (3, 6, 9)]
+SAME_GROUP, SAME_NUMBER, OTHER_GROUP, MASTER_BONUS = 90, 80, 50, 5
+
+# Shown instead of a live blurb when Gemini is unavailable, by score band
+FALLBACK_BLURBS = [
+    (80, "💞 Rishta pakka! The stars are already booking the wedding band."),
+    (60, "🙂 Good match, a little adjustment and Mummy-Papa will be happy."),
+    (0, "🌶️ Spicy match, expect some masala along with the romance."),
+]
+
+
+def _wheel_position(sign_index):
+    return (sign_index - ZODIAC_SIGNS.index("Aries")) % 12
+
+
+def _root(number):
+    return number if number <= 9 else sum(int(digit) for digit in str(number))
+
+
+def _number_score(a, b):
+    root_a, root_b = _root(a), _root(b)
+    if root_a == root_b:
+        score = SAME_NUMBER
+    elif any(root_a in group and root_b in group for group in NUMBER_GROUPS):
+        score = SAME_GROUP
+    else:
+        score = OTHER_GROUP
+    return min(100, score + MASTER_BONUS * ((a > 9) + (b > 9)))
+
+
+# (sign x sign by index into ZODIAC_SIGNS, number x number by the number itself) uint8 score matrices
+@functools.lru_cache(maxsize=None)
+def _matrices():
+    import numpy as np
+
+    positions = np.array([_wheel_position(index) for index in range(12)])
+    distance = np.abs(positions[:, None] - positions[None, :])
+    signs = np.array(SCORE_BY_ASPECT, dtype=np.uint8)[np.minimum(distance, 12 - distance)]
+    numbers = np.zeros((max(NUMEROLOGY_NUMBERS) + 1,) * 2, dtype=np.uint8)
+    for a in NUMEROLOGY_NUMBERS:
+        for b in NUMEROLOGY_NUMBERS:
+            numbers[a, b] = _number_score(a, b)
+    return signs, numbers
+
+
+def _combine(sign_score, number_score):
+    return SIGN_WEIGHT * sign_score + (1 - SIGN_WEIGHT) * number_score
+
+
+# One pair, from the user's sign and number (as stored by the prediction) and a partner's DOB
+def compatibility(user_sign, user_number, partner_dob):
+    signs, numbers = _matrices()
+    day, month, _ = parse_dob(partner_dob)
+    partner_sign = zodiac_sign(day, month)
+    partner_number = numerology_number(sum(int(digit) for digit in partner_dob if digit.isdigit()))
+    sign_score = int(signs[ZODIAC_SIGNS.index(user_sign), ZODIAC_SIGNS.index(partner_sign)])
+    number_score = int(numbers[user_number, partner_number])
+    return {
+        "dob": partner_dob, "zodiac_sign": partner_sign, "numerology_number": partner_number,
+        "sign_score": sign_score, "number_score": number_score,
+        "score": round(_combine(sign_score, number_score)),
+    }
+
+
+# Scores (0-100 floats, -1 for invalid dates) of every candidate DOB (DD-MM-YYYY strings or datetime64)
+def score_candidates(user_sign, user_number, candidate_dobs):
+    import numpy as np
+
+    candidate_dobs = np.asarray(candidate_dobs)
+    if candidate_dobs.size == 0:  # np.asarray([]) is float64, which the date parser can't take
+        return np.zeros(0)
+    signs, numbers = _matrices()
+    sign_index = zodiac_indices(candidate_dobs)
+    number = numerology_batch(candidate_dobs)
+    valid = sign_index >= 0
+    sign_score = signs[ZODIAC_SIGNS.index(user_sign)][np.maximum(sign_index, 0)]
+    number_score = numbers[user_number][number]
+    return np.where(valid, _combine(sign_score, number_score), -1.0)
+
+
+# The k best candidates as [{"index", "dob", "zodiac_sign", "numerology_number", "score"}], best first
+# (ties by input order); np.partition keeps this linear in the candidate count
+def top_matches(user_sign, user_number, candidate_dobs, k=10):
+    import numpy as np
+
+    candidate_dobs = np.asarray(candidate_dobs)
+    scores = score_candidates(user_sign, user_number, candidate_dobs)
+    k = min(k, int((scores >= 0).sum()))
+    if k <= 0:
+        return []
+    # Everything above the k-th best score, then the earliest candidates tied with it
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = np.flatnonzero(scores > kth)
+    best = np.concatenate([above, np.flatnonzero(scores == kth)[: k - len(above)]])
+    best = best[np.lexsort((best, -scores[best]))]
+    if np.issubdtype(candidate_dobs.dtype, np.datetime64):
+        dobs = [day.strftime("%d-%m-%Y") for day in candidate_dobs[best].astype("datetime64[D]").tolist()]
+    else:
+        dobs = [str(dob) for dob in candidate_dobs[best]]
+    return [{"index": index, **compatibility(user_sign, user_number, dob)} for index, dob in zip(best.tolist(), dobs)]
+
+
+def blurb_prompt(user_info, matches):
+    partners = "\n".join(
+        json.dumps({
+            "id": str(index), "name": match.get("name", ""), "zodiac": match["zodiac_sign"],
+            "numerology": match["numerology_number"], "score": match["score"],
+        }, ensure_ascii=False)
+        for index, match in enumerate(matches)
+    )
+    return (
+        f"You are LoveGuru, a funny Indian astrologer. {user_info['name']} (Zodiac '{user_info['zodiac_sign']}', "
+        f"Numerology '{user_info['numerology_number']}') wants to know about these possible partners, "
+        f"each with a compatibility score out of 100. For EACH partner write ONE funny line (under 25 words) "
+        f"in Indian context with an emoji.\n\n"
+        f"Partners (one JSON object per line):\n{partners}\n\n"
+        f'Reply with ONLY a JSON object of the form {{"readings": [{{"id": "<id>", "prediction": "<line>"}}]}} '
+        f"with exactly one reading per id."
+    )
+
+
+def fallback_blurb(score):
+    return next(blurb for minimum, blurb in FALLBACK_BLURBS if score >= minimum)
+
+
+# Adds a "blurb" to the first `limit` matches with a single Gemini call; the rest are left as they are
+def add_blurbs(user_info, matches, limit=3):
+    chosen = matches[:limit]
+    if not chosen:
+        return matches
+    try:
+        blurbs = parse_batch_reply(gemini_client.generate_text(blurb_prompt(user_info, chosen), json_output=True))
+    except Exception as exc:  # Unavailable, or a reply that isn't the expected JSON; blurbs are optional
+        logger.warning(f"⚠️ Compatibility blurbs unavailable: {type(exc).__name__}: {exc}", extra={"event": "degraded"})
+        metrics.degraded("compatibility")
+        blurbs = {}
+    for index, match in enumerate(chosen):
+        match["blurb"] = blurbs.get(str(index)) or fallback_blurb(match["score"])
+    return matches
+
+
+# ========================= CLI =========================
+
+
+def _random_dobs(count):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    return np.datetime64("1960-01-01") + rng.integers(0, 20000, count).astype("timedelta64[D]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank candidate partners by zodiac and numerology compatibility")
+    parser.add_argument("--dob", required=True, help="The user's DD-MM-YYYY date of birth")
+    parser.add_argument("--name", default="You")
+    parser.add_argument("--candidates", help="CSV with a dob column (and optionally name)")
+    parser.add_argument("--random", type=int, default=0, help="Score this many random DOBs instead")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--blurbs", type=int, default=0, help="Matches that get an LLM blurb")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    day, month, _ = parse_dob(args.dob)
+    user_info = {
+        "name": args.name, "zodiac_sign": zodiac_sign(day, month),
+        "numerology_number": numerology_number(sum(int(digit) for digit in args.dob if digit.isdigit())),
+    }
+    names = None
+    if args.candidates:
+        with open(args.candidates, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        candidates = [(row.get("dob") or "").strip() for row in rows]
+        names = [row.get("name") or "" for row in rows]
+    else:
+        candidates = _random_dobs(args.random or 100_000)
+
+    started = time.perf_counter()
+    matches = top_matches(user_info["zodiac_sign"], user_info["numerology_number"], candidates, args.top)
+    elapsed = time.perf_counter() - started
+    if names:
+        for match in matches:
+            match["name"] = names[match["index"]]
+    add_blurbs(user_info, matches, args.blurbs)
+    for match in matches:
+        print(json.dumps(match, ensure_ascii=False))
+    print(f"⚡ {len(candidates)} candidates ranked in {elapsed:.3f}s ({len(candidates) / elapsed / 1e6:.1f}M/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+
+# Local stand-in for google.generativeai (select it with LOVEGURU_GEMINI_BACKEND=fake).
+# Implements the backend interface gemini_client relies on: configure(), GenerativeModel with
+# generate_content (optionally streamed), generate_content_async, count_tokens and start_chat,
+# and ChatSession.send_message. No network or API key; latency, chunking and failures are simulated.
+#
+# Settings (environment, or assign to `settings` at runtime):
+#   LOVEGURU_FAKE_LATENCY        fixed seconds per reply (shorthand for "fixed:<seconds>")
+#   LOVEGURU_FAKE_LATENCY_DIST   fixed:S | uniform:LOW,HIGH | normal:MEAN,STD | lognormal:MEDIAN,SIGMA
+#   LOVEGURU_FAKE_FIRST_TOKEN    share of the reply latency spent before the first chunk (default 0.3)
+#   LOVEGURU_FAKE_CHUNK_CHARS    characters per streamed chunk (default 40)
+#   LOVEGURU_FAKE_ERROR_RATE     probability that a call fails (default 0)
+#   LOVEGURU_FAKE_ERROR          ResourceExhausted | ServiceUnavailable | DeadlineExceeded | InternalServerError
+#   LOVEGURU_FAKE_SEED           random seed for reproducible runs
+
+CANNED_REPLY = (
+    "- 💍 The stars say shaadi is coming, but first Sharma ji's son must get married.\n"
+    "- 💘 Venus is smiling at you, Saturn is asking for dowry details.\n"
+    "- 😂 Your love line is strong, your patience line needs a recharge."
+)
+
+
+# Same class names as google.api_core.exceptions, so resilience.is_retryable treats them alike
+class ResourceExhausted(Exception):
+    pass
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class InternalServerError(Exception):
+    pass
+
+
+ERRORS = {cls.__name__: cls for cls in (ResourceExhausted, ServiceUnavailable, DeadlineExceeded, InternalServerError)}
+
+
+# Same names as google.generativeai.types, raised by ChatSession.history after an unfinished stream
+class IncompleteIterationError(Exception):
+    pass
+
+
+class BrokenResponseError(Exception):
+    pass
+
+
+class types:
+    IncompleteIterationError = IncompleteIterationError
+    BrokenResponseError = BrokenResponseError
+
+
+class Settings:
+    def __init__(self):
+        fixed = os.getenv("LOVEGURU_FAKE_LATENCY")
+        self.latency = os.getenv("LOVEGURU_FAKE_LATENCY_DIST", f"fixed:{fixed or 0}")
+        self.first_token_share = float(os.getenv("LOVEGURU_FAKE_FIRST_TOKEN", "0.3"))
+        self.chunk_chars = int(os.getenv("LOVEGURU_FAKE_CHUNK_CHARS", "40"))
+        self.error_rate = float(os.getenv("LOVEGURU_FAKE_ERROR_RATE", "0"))
+        self.error = os.getenv("LOVEGURU_FAKE_ERROR", "ResourceExhausted")
+        self.random = random.Random(os.getenv("LOVEGURU_FAKE_SEED"))
+
+    # Draw one reply latency in seconds from the configured distribution
+    def sample_latency(self):
+        kind, _, args = self.latency.partition(":")
+        values = [float(value) for value in args.split(",") if value]
+        if kind == "uniform":
+            return self.random.uniform(*values)
+        if kind == "normal":
+            return max(0.0, self.random.gauss(*values))
+        if kind == "lognormal":
+            return self.random.lognormvariate(math.log(values[0]), values[1])
+        return values[0] if values else 0.0
+
+    def maybe_fail(self):
+        if self.error_rate and self.random.random() < self.error_rate:
+            with _usage_lock:
+                usage["errors"] += 1
+            raise ERRORS[self.error](f"fake {self.error}")
+
+
+settings = Settings()
+
+# Token accounting across all fake calls (same ~4 characters per token estimate as the app)
+usage = {"calls": 0, "errors": 0, "prompt_tokens": 0, "response_tokens": 0}
+_usage_lock = threading.Lock()
+
+
+def reset_usage():
+    with _usage_lock:
+        for key in usage:
+            usage[key] = 0
+
+
+def configure(**kwargs):
+    pass
+
+
+def _content_text(content):
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(_content_text(item) for item in content)
+    if isinstance(content, dict):
+        parts = content.get("parts", [])
+    else:
+        parts = getattr(content, "parts", [content])
+    return "".join(part if isinstance(part, str) else getattr(part, "text", "") for part in parts)
+
+
+def _tokens(text):
+    return len(text) // 4 + 1
+
+
+class UsageMetadata:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class _Chunk:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class _Response:
+    def __init__(self, text, chunks, latency, usage_metadata):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self._chunks = chunks
+        # First chunk after first_token_share of the latency, the rest spread evenly
+        first = latency * settings.first_token_share
+        rest = (latency - first) / max(1, len(chunks) - 1)
+        self._delays = [first] + [rest] * (len(chunks) - 1)
+        self._done = False  # Set once a stream has been iterated to the end
+
+    def _iterated(self):
+        self._done = True
+
+    def _chunk(self, index):
+        last = index == len(self._chunks) - 1
+        return _Chunk(self._chunks[index], self.usage_metadata if last else None)
+
+    def __iter__(self):
+        for index, delay in enumerate(self._delays):
+            time.sleep(delay)
+            yield self._chunk(index)
+        self._iterated()
+
+    async def __aiter__(self):
+        for index, delay in enumerate(self._delays):
+            await asyncio.sleep(delay)
+            yield self._chunk(index)
+        self._iterated()
+
+
+def _reply(prompt, generation_config=None, system_instruction=None):
+    settings.maybe_fail()
+    prompt_text = _content_text(prompt)
+    if (generation_config or {}).get("response_mime_type") == "application/json":
+        # Micro-batch prompts: one reading per "id" in the prompt
+        ids = re.findall(r'"id": "([^"<]+)"', prompt_text)
+        text = json.dumps({"readings": [{"id": id_, "prediction": CANNED_REPLY} for id_ in ids]})
+    else:
+        text = f"{CANNED_REPLY}\n(LoveGuru heard: {prompt_text[-80:]})"
+    size = max(1, settings.chunk_chars)
+    chunks = [text[start:start + size] for start in range(0, len(text), size)]
+    metadata = UsageMetadata(_tokens((system_instruction or "") + prompt_text), _tokens(text))
+    with _usage_lock:
+        usage["calls"] += 1
+        usage["prompt_tokens"] += metadata.prompt_token_count
+        usage["response_tokens"] += metadata.candidates_token_count
+    return _Response(text, chunks, settings.sample_latency(), metadata)
+
+
+class GenerativeModel:
+    def __init__(self, model_name="fake-model", generation_config=None, system_instruction=None):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.system_instruction = system_instruction
+
+    def generate_content(self, contents, stream=False, generation_config=None, request_options=None):
+        response = _reply(contents, generation_config or self.generation_config, self.system_instruction)
+        if not stream:
+            time.sleep(sum(response._delays))
+        return response
+
+    async def generate_content_async(self, contents, stream=False, generation_config=None, request_options=None):
+        response = _reply(contents, generation_config or self.generation_config, self.system_instruction)
+        if not stream:
+            await asyncio.sleep(sum(response._delays))
+        return response
+
+    def count_tokens(self, contents, request_options=None):
+        return {"total_tokens": _tokens(_content_text(contents))}
+
+    def start_chat(self, history=None):
+        return ChatSession(self, history)
+
+
+# Like the SDK, a streamed turn joins the history only once its response has been iterated to the end;
+# until then (or rewind()) reading the history raises IncompleteIterationError
+class ChatSession:
+    def __init__(self, model, history=None):
+        self.model = model
+        self.history = history
+
+    @property
+    def history(self):
+        if self._last_received is not None:
+            if not self._last_received._done:
+                raise IncompleteIterationError("Please let the response complete iteration before reading history")
+            self._history += [self._last_sent, {"role": "model", "parts": [self._last_received.text]}]
+            self._last_sent = self._last_received = None
+        return self._history
+
+    @history.setter
+    def history(self, history):
+        self._history = list(history or [])
+        self._last_sent = self._last_received = None
+
+    def send_message(self, content, stream=False, request_options=None):
+        # Like the SDK, the whole history is sent with every turn
+        message = {"role": "user", "parts": [_content_text(content)]}
+        response = self.model.generate_content(self.history + [message], stream=stream)
+        if stream:
+            self._last_sent, self._last_received = message, response
+        else:
+            self._history += [message, {"role": "model", "parts": [response.text]}]
+        return response
+
+    def rewind(self):
+        if self._last_received is None:
+            return self._history.pop(-2), self._history.pop()
+        turn = self._last_sent, self._last_received
+        self._last_sent = self._last_received = None
+        return turn
@@ -0,0 +1,332 @@
+import argparse
+import bisect
+import csv
+import difflib
+import functools
+import logging
+import mmap
+import os
+import re
+import struct
+import time
+import unicodedata
+import zoneinfo
+from collections import namedtuple
+
+logger = logging.getLogger("loveguru")
+
+# Offline place-of-birth lookup. Places come from places.csv (bundled, Indian and major world cities)
+# or a GeoNames dump, and are packed into one file that is memory-mapped by every process:
+#   header | places (fixed-size, most populous first) | keys (sorted) | timezones | strings
+# Lookups are a binary search over the sorted keys. The app's place picker filters labels() client-side,
+# so the index only resolves and suggests places.
+#   python gazetteer.py --build [--source cities15000.txt]     (re)build the index
+#   python gazetteer.py "hazaribag, india"                     resolve a query
+
+PLACES_PATH = os.getenv("LOVEGURU_PLACES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "places.csv"))
+INDEX_PATH = os.getenv("LOVEGURU_GAZETTEER", "gazetteer.idx")
+FORMAT_VERSION = 2
+MAGIC = b"LGGZ"
+
+HEADER = struct.Struct("<4s8I")  # magic, version, places, keys, timezones, then 4 section offsets
+PLACE = struct.Struct("<ffIH" + "IH" * 4 + "2s")  # lat, lon, population, tz, (offset, length) of id/name/admin/country, cc
+KEY = struct.Struct("<IHI")  # key (offset, length), place index
+TZ = struct.Struct("<IH")
+ID_KEY_PREFIX = "@"  # Place ids are keys too; normalized queries never start with it
+SCAN_LIMIT = 512
+FUZZY_CUTOFF = 0.8
+MAX_ALT_NAMES = 10
+
+Place = namedtuple("Place", "id name admin country country_code lat lon tz population")
+
+
+def place_label(place):
+    return ", ".join(part for part in dict.fromkeys((place.name, place.admin, place.country)) if part)
+
+
+def normalize(text):
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w]+", " ", folded).split())
+
+
+def _slug(*parts):
+    return "-".join(normalize(part).replace(" ", "_") for part in parts if part)
+
+
+# ========================= Building =========================
+
+
+def _read_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {
+                "id": row.get("id") or _slug(row["country_code"], row["admin"], row["name"]),
+                "name": row["name"], "alt_names": [name for name in row["alt_names"].split("|") if name],
+                "admin": row["admin"], "country": row["country"], "country_code": row["country_code"],
+                "lat": float(row["lat"]), "lon": float(row["lon"]), "tz": row["tz"],
+                "population": int(row["population"] or 0),
+            }
+
+
+def _read_lookup(path, key_column, value_column):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        rows = (line.rstrip("\n").split("\t") for line in f if not line.startswith("#"))
+        return {row[key_column]: row[value_column] for row in rows if len(row) > max(key_column, value_column)}
+
+
+# GeoNames cities*.txt; admin1CodesASCII.txt and countryInfo.txt next to it supply region and country names
+def _read_geonames(path):
+    directory = os.path.dirname(path)
+    admins = _read_lookup(os.path.join(directory, "admin1CodesASCII.txt"), 0, 1)
+    countries = _read_lookup(os.path.join(directory, "countryInfo.txt"), 0, 4)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            row = line.rstrip("\n").split("\t")
+            if len(row) < 18:
+                continue
+            alt_names = [name for name in row[3].split(",") if name and normalize(name)]
+            yield {
+                "id": f"gn-{row[0]}", "name": row[1], "alt_names": [row[2], *alt_names[:MAX_ALT_NAMES]],
+                "admin": admins.get(f"{row[8]}.{row[10]}", ""), "country": countries.get(row[8], row[8]),
+                "country_code": row[8], "lat": float(row[4]), "lon": float(row[5]), "tz": row[17],
+                "population": int(row[14] or 0),
+            }
+
+
+class _Strings:
+    def __init__(self):
+        self.blob = bytearray()
+        self._offsets = {}
+
+    def add(self, text):
+        data = text.encode("utf-8")
+        if data not in self._offsets:
+            self._offsets[data] = len(self.blob)
+            self.blob += data
+        return self._offsets[data], len(data)
+
+
+# Pack `source` (places.csv or a GeoNames cities file) into the memory-mapped index at `path`
+def build(source=PLACES_PATH, path=INDEX_PATH):
+    started = time.perf_counter()
+    reader = _read_csv if source.endswith(".csv") else _read_geonames
+    places = sorted(reader(source), key=lambda place: -place["population"])
+    known_zones = zoneinfo.available_timezones()
+    strings, zones = _Strings(), {}
+    place_records, keys = bytearray(), []
+    for index, place in enumerate(places):
+        if place["tz"] not in known_zones:
+            logger.warning(f"⚠️ Unknown timezone {place['tz']!r} for {place['name']}")
+        tz_index = zones.setdefault(place["tz"], len(zones))
+        fields = [strings.add(place[field]) for field in ("id", "name", "admin", "country")]
+        place_records += PLACE.pack(
+            place["lat"], place["lon"], place["population"], tz_index,
+            *(value for field in fields for value in field), place["country_code"].encode()[:2],
+        )
+        names = {normalize(name) for name in (place["name"], *place["alt_names"])} - {""}
+        keys += [(name.encode("utf-8"), index) for name in names]
+        keys.append(((ID_KEY_PREFIX + place["id"]).encode("utf-8"), index))
+
+    keys.sort()
+    key_records = b"".join(KEY.pack(*strings.add(key.decode("utf-8")), index) for key, index in keys)
+    tz_records = b"".join(TZ.pack(*strings.add(zone)) for zone in zones)
+
+    places_offset = HEADER.size
+    keys_offset = places_offset + len(place_records)
+    tz_offset = keys_offset + len(key_records)
+    strings_offset = tz_offset + len(tz_records)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(places), len(keys), len(zones), places_offset, keys_offset, tz_offset, strings_offset,
+    )
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header + place_records + key_records + tz_records + strings.blob)
+    os.replace(temp_path, path)  # Processes that already mapped the old file keep reading it
+    logger.info(
+        f"🗺️ Gazetteer built: {len(places)} places, {len(keys)} keys in {time.perf_counter() - started:.2f}s",
+        extra={"event": "gazetteer_built", "places": len(places), "keys": len(keys)},
+    )
+    return path
+
+
+# ========================= Lookup =========================
+
+
+class Gazetteer:
+    def __init__(self, path=INDEX_PATH):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.place_count, self.key_count, tz_count,
+         self._places, self._keys, tz_offset, self._strings) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} gazetteer index")
+        self._zones = [self._string(*TZ.unpack_from(self._map, tz_offset + i * TZ.size)) for i in range(tz_count)]
+
+    def _bytes(self, offset, length):
+        start = self._strings + offset
+        return self._map[start:start + length]
+
+    def _string(self, offset, length):
+        return self._bytes(offset, length).decode("utf-8")
+
+    def place(self, index):
+        (lat, lon, population, tz, id_off, id_len, name_off, name_len,
+         admin_off, admin_len, country_off, country_len, cc) = PLACE.unpack_from(self._map, self._places + index * PLACE.size)
+        return Place(
+            self._string(id_off, id_len), self._string(name_off, name_len), self._string(admin_off, admin_len),
+            self._string(country_off, country_len), cc.decode(), round(lat, 4), round(lon, 4), self._zones[tz], population,
+        )
+
+    def _key(self, position):
+        offset, length, index = KEY.unpack_from(self._map, self._keys + position * KEY.size)
+        return self._bytes(offset, length), index
+
+    # (key, place index) pairs whose key starts with `prefix`, in key order
+    def _scan(self, prefix, limit=SCAN_LIMIT):
+        position = bisect.bisect_left(range(self.key_count), prefix, key=lambda i: self._key(i)[0])
+        while position < self.key_count and limit > 0:
+            key, index = self._key(position)
+            if not key.startswith(prefix):
+                break
+            yield key, index
+            position += 1
+            limit -= 1
+
+    def by_id(self, place_id):
+        key = (ID_KEY_PREFIX + place_id).encode("utf-8")
+        for found, index in self._scan(key, limit=1):
+            if found == key:
+                return self.place(index)
+        return None
+
+    def labels(self, limit=None):
+        return [place_label(self.place(index)) for index in range(min(limit or self.place_count, self.place_count))]
+
+    # Best place for free text like "Hazaribag, India": exact or near-miss name, narrowed down by any
+    # region/country after the first comma, most populous first. None if nothing plausible matches.
+    def resolve(self, text):
+        parts = [normalize(part) for part in text.split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+        name, qualifiers = parts[0].encode("utf-8"), parts[1:]
+        indices = sorted({index for key, index in self._scan(name) if key == name})
+        if indices:
+            return self._qualified(indices, qualifiers)
+        # A misspelling is only corrected when the state or country typed after it agrees: a place missing
+        # from the list ("Patan") must not quietly become a different one ("Patna")
+        return self._qualified(self._close(parts[0]), qualifiers) if qualifiers else None
+
+    # Likely intended place for text that doesn't resolve on its own (a misspelling, or a name without
+    # its state), None if nothing is close
+    def suggest(self, text):
+        parts = [part for part in (normalize(part) for part in text.split(",")) if part]
+        if not parts or self.resolve(text) is not None:
+            return None
+        name = parts[0].encode("utf-8")
+        indices = sorted({index for key, index in self._scan(name) if key == name}) or self._close(parts[0])
+        ranked = self._ranked(indices, parts[1:])
+        return self.place(ranked[0]) if ranked else None
+
+    # Indices of places whose names are close to `name`, most populous first
+    def _close(self, name):
+        # Compare against the names sharing the first three letters
+        nearby = {}
+        for key, index in self._scan(name[:3].encode("utf-8"), limit=SCAN_LIMIT * 4):
+            nearby.setdefault(key.decode("utf-8"), []).append(index)
+        close = difflib.get_close_matches(name, nearby, n=3, cutoff=FUZZY_CUTOFF)
+        return sorted({index for match in close for index in nearby[match]})
+
+    # Places by how many qualifiers their state/country agree with (a prefix or a near miss), then index
+    # order. Places agreeing with none are dropped: "Paris, Texas" must not suggest Paris, France.
+    def _ranked(self, indices, qualifiers):
+        if not qualifiers:
+            return list(indices)
+        ranked = []
+        for index in indices:
+            place = self.place(index)
+            fields = [normalize(place.admin), normalize(place.country), place.country_code.lower()]
+            agreeing = sum(
+                any(
+                    field.startswith(qualifier) or difflib.SequenceMatcher(None, qualifier, field).ratio() >= FUZZY_CUTOFF
+                    for field in fields
+                )
+                for qualifier in qualifiers
+            )
+            if agreeing:
+                ranked.append((-agreeing, index))
+        return [index for _, index in sorted(ranked)]
+
+    # First place (in index order) whose state/country match every qualifier
+    def _qualified(self, indices, qualifiers):
+        for index in indices:
+            place = self.place(index)
+            fields = [normalize(place.admin), normalize(place.country), place.country_code.lower()]
+            if all(any(field.startswith(qualifier) for field in fields) for qualifier in qualifiers):
+                return place
+        return None
+
+
+# The index for this process, (re)built when missing, older than the places file or in an older format
+@functools.lru_cache(maxsize=None)
+def get_gazetteer(path=INDEX_PATH, source=PLACES_PATH):
+    stale = not os.path.exists(path) or (os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(path))
+    if stale:
+        build(source, path)
+    try:
+        return Gazetteer(path)
+    except ValueError:  # Written by an older version of this module
+        build(source, path)
+        return Gazetteer(path)
+
+
+# (canonical label, place id) for a free-text place; the text itself and "" when it isn't in the gazetteer
+def normalize_place(text):
+    try:
+        place = get_gazetteer().resolve(text)
+    except (OSError, ValueError) as exc:
+        logger.warning(f"⚠️ Gazetteer unavailable: {exc}")
+        place = None
+    if place is None:
+        return text.strip(), ""
+    return place_label(place), place.id
+
+
+# Label of the place the user probably meant when normalize_place didn't recognize the text, else ""
+def suggest_place(text):
+    try:
+        place = get_gazetteer().suggest(text)
+    except (OSError, ValueError) as exc:
+        logger.warning(f"⚠️ Gazetteer unavailable: {exc}")
+        place = None
+    return place_label(place) if place else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline place-of-birth gazetteer")
+    parser.add_argument("query", nargs="?", help="place to resolve")
+    parser.add_argument("--build", action="store_true", help="(re)build the index")
+    parser.add_argument("--source", default=PLACES_PATH, help="places.csv or a GeoNames cities*.txt")
+    parser.add_argument("--index", default=INDEX_PATH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.build:
+        build(args.source, args.index)
+    if args.query:
+        gazetteer = get_gazetteer(args.index, args.source)
+        started = time.perf_counter()
+        place = gazetteer.resolve(args.query)
+        meant = gazetteer.suggest(args.query)
+        elapsed = time.perf_counter() - started
+        print(f"resolved: {place_label(place) + f' ({place.id}, {place.lat}, {place.lon}, {place.tz})' if place else '-'}")
+        if meant:
+            print(f"did you mean: {place_label(meant)}")
+        print(f"{elapsed * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import functools
+import importlib
+import logging
+import os
+import threading
+import time
+
+import metrics
+import startup_timing
+from resilience import CallPolicy, CircuitBreaker, TokenBucket
+
+logger = logging.getLogger("loveguru")
+
+# All Gemini settings live here
+MODEL_NAME = os.getenv("LOVEGURU_MODEL", "gemini-2.0-flash-001")  # 🔥 Faster model
+REQUEST_TIMEOUT = float(os.getenv("LOVEGURU_GEMINI_TIMEOUT", "30"))  # Seconds per request
+BACKEND = os.getenv("LOVEGURU_GEMINI_BACKEND", "gemini")  # A name from BACKENDS, or any importable module
+TRANSPORT = os.getenv("LOVEGURU_GEMINI_TRANSPORT", "grpc")  # grpc keeps one long-lived channel per process
+DEADLINE = float(os.getenv("LOVEGURU_GEMINI_DEADLINE", "45"))  # Seconds per request, retries included
+MAX_ATTEMPTS = int(os.getenv("LOVEGURU_GEMINI_MAX_ATTEMPTS", "3"))
+RATE_LIMIT = float(os.getenv("LOVEGURU_GEMINI_RPM", "15")) / 60  # Requests per second, sized to the quota
+RATE_BURST = int(os.getenv("LOVEGURU_GEMINI_BURST", "5"))
+GENERATION_CONFIG = {
+    "max_output_tokens": int(os.getenv("LOVEGURU_MAX_OUTPUT_TOKENS", "1024")),
+}
+
+# Backends implement the slice of the google.generativeai API used below: configure(), and
+# GenerativeModel(...) with generate_content[_async], count_tokens and start_chat().send_message
+BACKENDS = {
+    "gemini": "google.generativeai",
+    "fake": "fake_gemini",  # Local stand-in with simulated latency, streaming, errors and token usage
+}
+
+# Import the backend (google.generativeai by default) and configure it once per process
+@functools.lru_cache(maxsize=None)
+def get_genai():
+    module = BACKENDS.get(BACKEND, BACKEND)
+    genai = startup_timing.timed("import_genai", importlib.import_module, module)
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"), transport=TRANSPORT)
+    return genai
+
+# Switch backends at runtime (benchmarks, tests); drops the cached module and model
+def use_backend(name):
+    global BACKEND
+    BACKEND = name
+    get_genai.cache_clear()
+    get_model.cache_clear()
+
+# One model object per process; it reuses the SDK's shared client and its connection
+@functools.lru_cache(maxsize=None)
+def get_model():
+    return get_genai().GenerativeModel(MODEL_NAME, generation_config=GENERATION_CONFIG)
+
+def request_options(timeout=REQUEST_TIMEOUT):
+    return {"timeout": timeout}
+
+# Shared rate limiter, retries, deadline and circuit breaker for every Gemini call in the process.
+# Calls that fail fast or give up raise resilience.Unavailable.
+@functools.lru_cache(maxsize=None)
+def get_policy():
+    return CallPolicy(
+        TokenBucket(RATE_LIMIT, RATE_BURST),
+        CircuitBreaker(
+            failure_threshold=int(os.getenv("LOVEGURU_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("LOVEGURU_BREAKER_RESET", "30")),
+        ),
+        max_attempts=MAX_ATTEMPTS,
+        deadline_seconds=DEADLINE,
+        attempt_timeout=REQUEST_TIMEOUT,
+    )
+
+# Function to get a complete Gemini reply (optionally as JSON, or with a larger output budget)
+def generate_text(prompt, json_output=False, max_output_tokens=None):
+    generation_config = None
+    if json_output or max_output_tokens:
+        generation_config = dict(GENERATION_CONFIG)
+        if json_output:
+            generation_config["response_mime_type"] = "application/json"
+        if max_output_tokens:
+            generation_config["max_output_tokens"] = max_output_tokens
+
+    with metrics.gemini_call("generate") as span:
+        def attempt(timeout):
+            response = get_model().generate_content(
+                prompt, generation_config=generation_config, request_options=request_options(timeout)
+            )
+            _record_usage(span, response)
+            return response.text.strip()
+
+        return get_policy().call(attempt)
+
+# Token counts for metrics.gemini_call; streams keep the last chunk that reports usage (the final totals)
+def _record_usage(span, response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        span["usage"] = usage
+
+# Text of one streamed chunk ("" for chunks without text parts, e.g. only finish metadata)
+def _chunk_text(chunk):
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+def _record_chunk(timings, started):
+    if timings["first_token"] is None:
+        timings["first_token"] = time.perf_counter() - started
+
+def _finish_stream(timings, started):
+    timings["total"] = time.perf_counter() - started
+    if timings["first_token"] is None:
+        timings["first_token"] = timings["total"]
+
+# Yield non-empty chunk texts, recording time-to-first-token and total time in `timings`
+def _iter_text(texts, timings):
+    started = time.perf_counter()
+    timings["first_token"] = None
+    for text in texts:
+        if text:
+            _record_chunk(timings, started)
+            yield text
+    _finish_stream(timings, started)
+
+async def _aiter_text(texts, timings):
+    started = time.perf_counter()
+    timings["first_token"] = None
+    async for text in texts:
+        if text:
+            _record_chunk(timings, started)
+            yield text
+    _finish_stream(timings, started)
+
+# Function to stream a Gemini reply
+def stream_text(prompt, timings):
+    with metrics.gemini_call("stream") as span:
+        def attempt(timeout):
+            response = get_model().generate_content(prompt, stream=True, request_options=request_options(timeout))
+            for chunk in response:
+                _record_usage(span, chunk)
+                yield _chunk_text(chunk)
+
+        yield from _iter_text(get_policy().stream(attempt), timings)
+
+# Async variants (SDK asyncio client), for serving many predictions from one event loop
+async def agenerate_text(prompt):
+    with metrics.gemini_call("generate") as span:
+        async def attempt(timeout):
+            response = await get_model().generate_content_async(prompt, request_options=request_options(timeout))
+            _record_usage(span, response)
+            return response.text.strip()
+
+        return await get_policy().acall(attempt)
+
+async def astream_text(prompt, timings):
+    with metrics.gemini_call("stream") as span:
+        async def attempt(timeout):
+            response = await get_model().generate_content_async(
+                prompt, stream=True, request_options=request_options(timeout)
+            )
+            async for chunk in response:
+                _record_usage(span, chunk)
+                yield _chunk_text(chunk)
+
+        async for text in _aiter_text(get_policy().astream(attempt), timings):
+            yield text
+
+# Start a multi-turn chat; the static persona/profile goes in once as the system instruction
+def start_chat(system_instruction, history=None):
+    model = get_genai().GenerativeModel(
+        MODEL_NAME, generation_config=GENERATION_CONFIG, system_instruction=system_instruction
+    )
+    return model.start_chat(history=history or [])
+
+# A chat's history, or None when its last streamed turn never finished cleanly (abandoned, broken
+# or blocked); the SDK raises on every later use of such a chat, so it has to be rebuilt
+def chat_history(chat):
+    types = get_genai().types
+    try:
+        return chat.history
+    except (types.IncompleteIterationError, types.BrokenResponseError):
+        return None
+
+# A stream that broke, was blocked or was abandoned mid-way leaves a half-finished turn in the SDK chat; drop it
+def _discard_broken_turn(chat):
+    try:
+        chat.history
+    except Exception:
+        chat.rewind()
+
+# Function to send only the new message of a chat turn and get the complete reply
+def send_chat_text(chat, message):
+    with metrics.gemini_call("chat") as span:
+        def attempt(timeout):
+            response = chat.send_message(message, request_options=request_options(timeout))
+            _record_usage(span, response)
+            return response.text.strip()
+
+        return get_policy().call(attempt)
+
+# Function to send only the new message of a chat turn and stream the reply
+def stream_chat_text(chat, message, timings):
+    with metrics.gemini_call("chat") as span:
+        def attempt(timeout):
+            try:
+                for chunk in chat.send_message(message, stream=True, request_options=request_options(timeout)):
+                    _record_usage(span, chunk)
+                    yield _chunk_text(chunk)
+            finally:  # Also on GeneratorExit and Streamlit's rerun/stop, which aren't Exceptions
+                _discard_broken_turn(chat)
+
+        yield from _iter_text(get_policy().stream(attempt), timings)
+
+# Open the connection ahead of the first user request (a cheap token count round-trip)
+def warm_up(background=True):
+    def run():
+        started = time.perf_counter()
+        try:
+            get_model().count_tokens("warm up", request_options=request_options())
+            logger.info(f"🔌 Gemini connection warmed in {time.perf_counter() - started:.2f}s")
+        except Exception as exc:
+            logger.warning(f"⚠️ Gemini warm-up failed: {exc}")
+
+    if background:
+        threading.Thread(target=run, name="gemini-warm-up", daemon=True).start()
+    else:
+        run()
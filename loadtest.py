@@ -0,0 +1,187 @@
+import argparse
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# End-to-end load test: many simulated browser sessions drive the real app.py (via Streamlit's
+# AppTest) against the fake Gemini backend, at increasing concurrency levels:
+#   python loadtest.py --levels 1,2,4,8,16 --sessions-per-level 16 --questions 5
+# Each session fills the user_info form, then asks a series of chat questions. Reported per level:
+# sessions/sec, latency percentiles per rerun kind, memory per session, and where latency degrades.
+os.environ.setdefault("LOVEGURU_GEMINI_BACKEND", "fake")
+os.environ.setdefault("LOVEGURU_FAKE_LATENCY_DIST", "lognormal:0.8,0.4")  # Roughly Gemini Flash
+os.environ.setdefault("LOVEGURU_GEMINI_RPM", "1000000")
+os.environ.setdefault("LOVEGURU_CACHE_DB", "")
+
+import streamlit
+
+# _share_test_runtime patches private Streamlit internals as they are in this release (major.minor).
+# Check them against a new release before changing it here; any other version stops the run up front.
+PATCHED_STREAMLIT = "1.65"
+if ".".join(streamlit.__version__.split(".")[:2]) != PATCHED_STREAMLIT:
+    raise SystemExit(
+        f"loadtest.py patches Streamlit {PATCHED_STREAMLIT} internals (Runtime.instance/exists, AppTest's "
+        f"ScriptCache) but Streamlit {streamlit.__version__} is installed; pip install 'streamlit=={PATCHED_STREAMLIT}.*'"
+    )
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+# The load generator's own threads have no ScriptRunContext, by design
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+    lambda record: "missing ScriptRunContext" not in record.getMessage()
+)
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+QUESTIONS = [
+    "when will I get married?", "is my crush secretly into me?", "love marriage or arranged?",
+    "will my parents agree?", "what is my lucky day for a proposal?", "should I text my ex?",
+]
+
+
+# AppTest is built for one app at a time; make it behave like a single server process hosting many sessions:
+# - it installs a mock Runtime in a process-wide slot for each run and clears it afterwards, which races when
+#   sessions run side by side (one run clears the slot under another), so the last one stays reachable;
+# - it compiles the script afresh on every run, and concurrent compile() calls can crash CPython 3.11,
+#   so all runs share one ScriptCache like a real server does.
+def _share_test_runtime():
+    if not hasattr(Runtime, "_instance") or not hasattr(app_test, "ScriptCache"):
+        raise SystemExit(f"Streamlit {streamlit.__version__} no longer has the internals loadtest.py patches")
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        if last:
+            return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    return {"p50_ms": round(quantiles[49] * 1000, 1), "p95_ms": round(quantiles[94] * 1000, 1), "p99_ms": round(quantiles[98] * 1000, 1)}
+
+
+# One simulated user; returns (rerun timings by kind, the AppTest kept alive for memory accounting)
+def run_session(index, questions, timeout):
+    timings = {"first_load": [], "idle_rerun": [], "submit": [], "ask": []}
+
+    def timed(kind, app):
+        started = time.perf_counter()
+        app.run(timeout=timeout)
+        timings[kind].append(time.perf_counter() - started)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    timed("first_load", app)
+    app.text_input[0].input(f"Load User {index}")
+    app.text_input[1].input(f"{index % 28 + 1:02d}-{index % 12 + 1:02d}-{1970 + index % 35}")
+    app.selectbox[0].set_value("Hazaribagh, Jharkhand, India")
+    app.button[0].click()
+    timed("submit", app)
+    for turn in range(questions):
+        app.text_input[0].input(f"{QUESTIONS[turn % len(QUESTIONS)]} ({turn})")
+        app.button(key="ask_loveguru").click()
+        timed("ask", app)
+        timed("idle_rerun", app)  # A widget interaction that re-renders the whole history
+    return timings, app
+
+
+def run_level(concurrency, sessions, questions, timeout):
+    kept = []  # Finished sessions stay alive until the memory reading
+    merged = {"first_load": [], "idle_rerun": [], "submit": [], "ask": []}
+    errors = []
+    lock = threading.Lock()
+    rss_before = rss_bytes()
+
+    def one(index):
+        try:
+            timings, app = run_session(index, questions, timeout)
+        except Exception as exc:
+            with lock:
+                errors.append(f"{type(exc).__name__}: {exc}")
+            return
+        with lock:
+            kept.append(app)
+            for kind, samples in timings.items():
+                merged[kind].extend(samples)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(concurrency * 100_000, concurrency * 100_000 + sessions)))
+    elapsed = time.perf_counter() - started
+    rss_after = rss_bytes()
+
+    result = {
+        "concurrency": concurrency,
+        "sessions": len(kept),
+        "errors": len(errors),
+        "sessions_per_second": round(len(kept) / elapsed, 2),
+        **{kind: percentiles(samples) for kind, samples in merged.items()},
+    }
+    if rss_before is not None and kept:
+        result["memory_per_session_kib"] = round((rss_after - rss_before) / len(kept) / 1024, 1)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+# First level whose rerun p95 is more than `factor` times the single-session level's
+def degradation_point(results, kind="ask", factor=2.0):
+    baseline = results[0].get(kind, {}).get("p95_ms")
+    for result in results[1:]:
+        p95 = result.get(kind, {}).get("p95_ms")
+        if baseline and p95 and p95 > baseline * factor:
+            return result["concurrency"]
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent session load test for the Streamlit app")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--sessions-per-level", type=int, default=16)
+    parser.add_argument("--questions", type=int, default=5, help="Chat questions per session")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds allowed per rerun")
+    parser.add_argument("--degrade-factor", type=float, default=2.0, help="p95 growth that counts as degraded")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    _share_test_runtime()
+    run_session(0, 1, args.timeout)  # Warm-up: imports, graph compile and cached resources aren't per-session cost
+    results = []
+    for level in (int(value) for value in args.levels.split(",")):
+        result = run_level(level, max(level, args.sessions_per_level), args.questions, args.timeout)
+        results.append(result)
+        print(f"concurrency={level:<4} sessions/s={result['sessions_per_second']:<7} "
+              f"ask p95={result['ask'].get('p95_ms')}ms idle rerun p95={result['idle_rerun'].get('p95_ms')}ms "
+              f"mem/session={result.get('memory_per_session_kib')}KiB errors={result['errors']}")
+
+    point = degradation_point(results, factor=args.degrade_factor)
+    print(f"📉 Ask latency degrades (p95 > {args.degrade_factor}x single session) at concurrency {point}"
+          if point else "✅ No latency degradation across the tested levels")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"levels": results, "degradation_point": point}, f, indent=2)
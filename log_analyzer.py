@@ -0,0 +1,319 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+
+# Incremental analytics over chatbot_logs.log:
+#   python log_analyzer.py                      read new bytes since the last run, print the report
+#   python log_analyzer.py --json               same, as JSON
+#   python log_analyzer.py --reset              forget the saved state and start from the beginning
+# Only bytes appended since the last run are parsed: the state file keeps the byte offset and rolling
+# aggregates, so re-running on a multi-GB log is cheap. Both log formats are understood:
+#   2025-02-22 11:30:00,123 - INFO - 👤 New user: Gunjan, DOB: 22-02-2000, Place: Hazaribagh   (plain text)
+#   {"ts": "...", "event": "new_user", "session_id": "...", "user": "Gunjan", ...}              (structured_logging)
+# A rotated or replaced log (smaller than the offset, or different first bytes) is read from the start.
+
+STATE_VERSION = 1
+CHUNK_BYTES = 8 * 1024 * 1024
+FINGERPRINT_BYTES = 256
+TOP_QUESTIONS_CAPACITY = 500  # Approximate top-k: counters beyond this are pruned to the heaviest ones
+
+TEXT_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ - (\w+) - (.*)$", re.S)
+NEW_USER = re.compile(r"^👤 New user: (.*), DOB: (.*), Place: (.*)$", re.S)
+ASKED = re.compile(r"^📩 (.*?) asked: (.*)$", re.S)
+REPLIED = re.compile(r"^🤖 Bot replied to (.*?): (.*)$", re.S)
+RECORD_START = re.compile(rb"\{|\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},")
+
+
+def new_state():
+    return {
+        "version": STATE_VERSION,
+        "offset": 0,
+        "fingerprint": "",  # Hash of the first bytes already read, to notice a replaced file
+        "fingerprint_bytes": 0,
+        "rotated_bytes": 0,  # Bytes read from earlier (rotated or replaced) files
+        "events": {},
+        "submissions": 0,
+        "duplicate_submissions": 0,
+        "recent_submissions": {},  # submission key -> last seen (epoch), pruned past the duplicate window
+        "open_sessions": {},  # session -> [questions, last seen (epoch)]
+        "closed_sessions": {},  # questions asked -> sessions (sessions idle past the session timeout)
+        "questions": 0,
+        "top_questions": {},
+        "responses_by_day": {},  # YYYY-MM-DD -> {count, chars, max_chars, latency_ms, latency_count}
+    }
+
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return new_state()
+    return state if state.get("version") == STATE_VERSION else new_state()
+
+
+# Written to a temporary file first, so a crash never leaves half a state file behind
+def save_state(state, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def normalize_question(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _submission_key(name, dob, place):
+    raw = "|".join(" ".join(part.lower().split()) for part in (name, dob, place))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+# ========================= Parsing =========================
+
+
+def _epoch(ts):
+    return datetime.datetime.fromisoformat(ts).timestamp()
+
+
+# One log record -> (epoch, event dict) or None; multi-line text records arrive already joined.
+# JSON lines without a usable "ts" (or with a non-string event) aren't ours and are skipped.
+def parse_record(record):
+    if record.startswith("{"):
+        try:
+            entry = json.loads(record)
+        except json.JSONDecodeError:
+            return None
+        ts = entry.get("ts")
+        if not isinstance(ts, str) or not isinstance(entry.get("event", "log"), str):
+            return None
+        try:
+            return _epoch(ts), entry
+        except ValueError:
+            return None
+
+    match = TEXT_LINE.match(record)
+    if not match:
+        return None
+    ts, level, message = match.groups()
+    epoch = _epoch(ts.replace(" ", "T"))
+    entry = {"ts": ts, "level": level, "event": "log", "msg": message}
+    if found := NEW_USER.match(message):
+        entry.update(event="new_user", user=found[1], dob=found[2], place=found[3])
+    elif found := ASKED.match(message):
+        entry.update(event="question", user=found[1], text=found[2])
+    elif found := REPLIED.match(message):
+        entry.update(event="bot_reply", user=found[1], text=found[2])
+    return epoch, entry
+
+
+# Split bytes into records: JSON records are one line, a plain-text record runs until the next
+# line that starts with a timestamp (bot replies span several lines)
+def _is_record_start(line):
+    return RECORD_START.match(line) is not None
+
+
+# ========================= Aggregation =========================
+
+
+class Analyzer:
+    def __init__(self, state, duplicate_window, session_timeout):
+        self.state = state
+        self.duplicate_window = duplicate_window
+        self.session_timeout = session_timeout
+        self.latest = 0.0
+
+    def add(self, epoch, entry):
+        state = self.state
+        event = entry.get("event", "log")
+        state["events"][event] = state["events"].get(event, 0) + 1
+        self.latest = max(self.latest, epoch)
+        # Plain-text lines have no session id; the user name is the closest thing
+        session = entry.get("session_id") or f"user:{entry.get('user', '')}"
+
+        if event == "new_user":
+            key = _submission_key(entry.get("user", ""), entry.get("dob", ""), entry.get("place", ""))
+            last_seen = state["recent_submissions"].get(key)
+            state["submissions"] += 1
+            if last_seen is not None and epoch - last_seen <= self.duplicate_window:
+                state["duplicate_submissions"] += 1
+            state["recent_submissions"][key] = epoch
+        elif event == "question":
+            state["questions"] += 1
+            counts = state["open_sessions"].get(session)
+            if counts is not None and epoch - counts[1] > self.session_timeout:
+                self._close_session(session)  # Same user back after a long pause: a new session
+                counts = None
+            if counts is None:
+                counts = state["open_sessions"][session] = [0, epoch]
+            counts[0] += 1
+            counts[1] = epoch
+            if entry.get("text"):  # Sampled-out payloads only have text_chars
+                question = normalize_question(entry["text"])
+                state["top_questions"][question] = state["top_questions"].get(question, 0) + 1
+                if len(state["top_questions"]) > 2 * TOP_QUESTIONS_CAPACITY:
+                    self._prune_top_questions()
+        elif event == "bot_reply":
+            chars = len(entry["text"]) if entry.get("text") is not None else entry.get("text_chars")
+            # Days as written in the log: local time for plain-text lines, UTC for JSON lines
+            day = self.state["responses_by_day"].setdefault(
+                entry["ts"][:10],
+                {"count": 0, "chars": 0, "max_chars": 0, "latency_ms": 0.0, "latency_count": 0},
+            )
+            day["count"] += 1
+            if chars is not None:
+                day["chars"] += chars
+                day["max_chars"] = max(day["max_chars"], chars)
+            if entry.get("latency_ms") is not None:
+                day["latency_ms"] += entry["latency_ms"]
+                day["latency_count"] += 1
+
+    def _prune_top_questions(self):
+        heaviest = sorted(self.state["top_questions"].items(), key=lambda item: -item[1])[:TOP_QUESTIONS_CAPACITY]
+        self.state["top_questions"] = dict(heaviest)
+
+    def _close_session(self, session):
+        questions, _ = self.state["open_sessions"].pop(session)
+        closed = self.state["closed_sessions"]
+        closed[str(questions)] = closed.get(str(questions), 0) + 1
+
+    # Fold idle sessions into the histogram and forget old submission keys, keeping the state small
+    def compact(self):
+        state = self.state
+        for session, (_, last_seen) in list(state["open_sessions"].items()):
+            if self.latest - last_seen > self.session_timeout:
+                self._close_session(session)
+        state["recent_submissions"] = {
+            key: seen for key, seen in state["recent_submissions"].items()
+            if self.latest - seen <= self.duplicate_window
+        }
+
+
+def _fingerprint(f, length):
+    f.seek(0)
+    return hashlib.sha256(f.read(length)).hexdigest()[:16]
+
+
+# Parse the bytes appended since the saved offset; returns the number of bytes read
+def process(log_path, state, analyzer, state_path=None):
+    with open(log_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        replaced = state["fingerprint_bytes"] and _fingerprint(f, state["fingerprint_bytes"]) != state["fingerprint"]
+        if size < state["offset"] or replaced:
+            # A new file (rotation): read it from the start, keeping everything aggregated so far
+            state["rotated_bytes"] = state.get("rotated_bytes", 0) + state["offset"]
+            state["offset"], state["fingerprint"], state["fingerprint_bytes"] = 0, "", 0
+
+        started_at = state["offset"]
+        f.seek(started_at)
+        pending = []  # Lines of the record being assembled
+        pending_offset = started_at  # Where that record starts; the offset never moves past it
+        buffer = b""
+        while chunk := f.read(CHUNK_BYTES):
+            buffer += chunk
+            lines = buffer.split(b"\n")
+            buffer = lines.pop()  # Incomplete last line, finished by the next chunk or the next run
+            position = pending_offset + sum(len(line) + 1 for line in pending)
+            for line in lines:
+                if _is_record_start(line) and pending:
+                    _finish(pending, analyzer)
+                    pending_offset = position
+                    pending = []
+                pending.append(line)
+                position += len(line) + 1
+            if state_path and pending_offset - state["offset"] > CHUNK_BYTES:
+                # Progress survives an interrupted multi-GB run (the fingerprint is final once the
+                # offset is past its bytes)
+                state["offset"] = pending_offset
+                analyzer.compact()
+                save_state(state, state_path)
+        # The file ends with a newline: whole records are written at once, so the last one is complete
+        if pending and not buffer:
+            _finish(pending, analyzer)
+            pending_offset += sum(len(line) + 1 for line in pending)
+        state["offset"] = pending_offset
+        state["fingerprint_bytes"] = min(FINGERPRINT_BYTES, state["offset"])
+        state["fingerprint"] = _fingerprint(f, state["fingerprint_bytes"])
+    analyzer.compact()
+    return state["offset"] - started_at
+
+
+def _finish(lines, analyzer):
+    parsed = parse_record(b"\n".join(lines).decode("utf-8", errors="replace"))
+    if parsed is not None:
+        analyzer.add(*parsed)
+
+
+# ========================= Report =========================
+
+
+def report(state, top=10):
+    histogram = dict(state["closed_sessions"])
+    for questions, _ in state["open_sessions"].values():
+        histogram[str(questions)] = histogram.get(str(questions), 0) + 1
+    sessions = sum(histogram.values())
+    submissions = state["submissions"]
+    return {
+        "bytes_processed": state.get("rotated_bytes", 0) + state["offset"],
+        "events": state["events"],
+        "submissions": submissions,
+        "duplicate_submissions": state["duplicate_submissions"],
+        "duplicate_submission_rate": round(state["duplicate_submissions"] / submissions, 4) if submissions else 0.0,
+        "sessions_with_questions": sessions,
+        "questions": state["questions"],
+        "questions_per_session": round(state["questions"] / sessions, 2) if sessions else 0.0,
+        "questions_per_session_histogram": dict(sorted(histogram.items(), key=lambda item: int(item[0]))),
+        "top_questions": sorted(state["top_questions"].items(), key=lambda item: -item[1])[:top],
+        "responses_by_day": {
+            day: {
+                "replies": totals["count"],
+                "avg_chars": round(totals["chars"] / totals["count"], 1) if totals["count"] else 0.0,
+                "max_chars": totals["max_chars"],
+                "avg_latency_ms": (
+                    round(totals["latency_ms"] / totals["latency_count"], 1) if totals["latency_count"] else None
+                ),
+            }
+            for day, totals in sorted(state["responses_by_day"].items())
+        },
+    }
+
+
+def print_report(summary):
+    print(f"📄 {summary['bytes_processed']} bytes analyzed, events: {summary['events']}")
+    print(f"👤 Submissions: {summary['submissions']}, duplicates: {summary['duplicate_submissions']} "
+          f"({summary['duplicate_submission_rate']:.1%})")
+    print(f"📩 Questions: {summary['questions']} over {summary['sessions_with_questions']} sessions "
+          f"({summary['questions_per_session']} per session), histogram: {summary['questions_per_session_histogram']}")
+    print("🔝 Most frequent questions:")
+    for question, count in summary["top_questions"]:
+        print(f"   {count:>6}  {question}")
+    print("🤖 Responses by day:")
+    for day, totals in summary["responses_by_day"].items():
+        print(f"   {day}  replies={totals['replies']:<6} avg_chars={totals['avg_chars']:<8} "
+              f"max_chars={totals['max_chars']:<6} avg_latency_ms={totals['avg_latency_ms']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental analytics over chatbot_logs.log")
+    parser.add_argument("--log", default="chatbot_logs.log")
+    parser.add_argument("--state", default="log_analyzer_state.json", help="Offset and aggregates between runs")
+    parser.add_argument("--reset", action="store_true", help="Ignore the saved state and re-read the whole log")
+    parser.add_argument("--top", type=int, default=10, help="Most frequent questions to show")
+    parser.add_argument("--duplicate-window", type=float, default=3600, help="Seconds within which a repeat submission counts as a duplicate")
+    parser.add_argument("--session-timeout", type=float, default=3600, help="Idle seconds after which a session is considered finished")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    state = new_state() if args.reset else load_state(args.state)
+    analyzer = Analyzer(state, args.duplicate_window, args.session_timeout)
+    if os.path.exists(args.log):
+        process(args.log, state, analyzer, args.state)
+    save_state(state, args.state)
+    summary = report(state, args.top)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_report(summary)
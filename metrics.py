@@ -0,0 +1,290 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Process-wide instrumentation: Prometheus-style counters and histograms, plus optional per-request traces.
+#   GET /metrics   text exposition format, scrape it with Prometheus or just curl it
+#   GET /traces    the most recent request traces as JSON
+# Traces are also written to LOVEGURU_TRACE_DIR (one JSON file per request) when it is set.
+
+logger = logging.getLogger("loveguru")
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TRACE_DIR = os.getenv("LOVEGURU_TRACE_DIR", "")
+TRACE_KEEP = int(os.getenv("LOVEGURU_TRACE_KEEP", "100"))
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_label_text(key)} {value}" for key, value in values]
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            bucket = bisect.bisect_left(self.buckets, value)
+            if bucket < len(self.buckets):  # Larger values only show up in +Inf
+                series[bucket] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, values in series:
+            cumulative = itertools.accumulate(values[:len(self.buckets)])
+            for bound, count in zip(self.buckets, cumulative):
+                lines.append(f"{self.name}_bucket{_label_text(key + (('le', bound),))} {count}")
+            lines.append(f"{self.name}_bucket{_label_text(key + (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_label_text(key)} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{_label_text(key)} {values[-1]}")
+        return lines
+
+
+NODE_SECONDS = Histogram("loveguru_node_seconds", "Wall time of each LangGraph node run")
+NODE_FAILURES = Counter("loveguru_node_failures_total", "LangGraph node runs that raised")
+GEMINI_SECONDS = Histogram("loveguru_gemini_call_seconds", "Wall time of Gemini calls, retries and streaming included")
+GEMINI_FAILURES = Counter("loveguru_gemini_failures_total", "Gemini calls that raised after retries")
+GEMINI_TOKENS = Counter("loveguru_gemini_tokens_total", "Prompt and response tokens from usage metadata")
+CACHE_LOOKUPS = Counter("loveguru_prediction_cache_lookups_total", "Prediction cache lookups by result")
+DEGRADED = Counter("loveguru_degraded_replies_total", "Fallback replies served while Gemini was unavailable")
+QUESTION_CACHE_LOOKUPS = Counter("loveguru_question_cache_lookups_total", "Chat question cache lookups by result")
+SESSIONS = Gauge("loveguru_sessions", "Chat sessions held by this process, in memory or spilled to disk")
+SESSION_BYTES = Gauge("loveguru_session_memory_bytes", "Estimated memory held by in-memory chat sessions")
+REGISTRY = [
+    NODE_SECONDS, NODE_FAILURES, GEMINI_SECONDS, GEMINI_FAILURES, GEMINI_TOKENS, CACHE_LOOKUPS, DEGRADED,
+    QUESTION_CACHE_LOOKUPS, SESSIONS, SESSION_BYTES,
+]
+
+
+def render():
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ========================= Per-request traces =========================
+# A trace collects one span per instrumented node/call made while it is open. LangGraph copies the
+# context into its worker threads, so spans recorded there land in the caller's trace.
+
+_current_trace = contextvars.ContextVar("loveguru_trace", default=None)
+_recent_traces = deque(maxlen=TRACE_KEEP)
+_trace_ids = itertools.count(1)
+
+
+@contextlib.contextmanager
+def trace(kind, **fields):
+    record = {"id": next(_trace_ids), "kind": kind, **fields, "started_at": time.time(), "spans": []}
+    token = _current_trace.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as exc:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current_trace.reset(token)
+        record["seconds"] = round(time.perf_counter() - started, 6)
+        _recent_traces.append(record)
+        if TRACE_DIR:
+            _dump_trace(record)
+
+
+def _dump_trace(record):
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"{int(record['started_at'] * 1000)}-{record['kind']}-{record['id']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+    except OSError as exc:
+        logger.warning(f"⚠️ Could not write trace: {exc}")
+
+
+def _add_span(span):
+    record = _current_trace.get()
+    if record is not None:
+        record["spans"].append(span)
+
+
+def recent_traces():
+    return list(_recent_traces)
+
+
+# ========================= Instrumentation hooks =========================
+
+
+def _finish_node(node, started, offset, error):
+    seconds = time.perf_counter() - started
+    NODE_SECONDS.observe(seconds, node=node)
+    if error is not None:
+        NODE_FAILURES.inc(node=node, error=type(error).__name__)
+    _add_span({"node": node, "offset": offset, "seconds": round(seconds, 6), "error": error and repr(error)})
+
+
+def _trace_offset():
+    record = _current_trace.get()
+    return round(time.time() - record["started_at"], 6) if record else None
+
+
+# Wrap a sync LangGraph node function so every run is timed and failures are counted
+def instrument_node(node, func):
+    @functools.wraps(func)
+    def wrapper(state):
+        started, offset, error = time.perf_counter(), _trace_offset(), None
+        try:
+            return func(state)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            _finish_node(node, started, offset, error)
+
+    return wrapper
+
+
+def instrument_anode(node, afunc):
+    @functools.wraps(afunc)
+    async def wrapper(state):
+        started, offset, error = time.perf_counter(), _trace_offset(), None
+        try:
+            return await afunc(state)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            _finish_node(node, started, offset, error)
+
+    return wrapper
+
+
+# Time one Gemini call. The caller stores the response's usage_metadata in span["usage"]
+# (for streams, the last chunk that carries it), and token counts are recorded from it on exit.
+@contextlib.contextmanager
+def gemini_call(call):
+    span = {"call": call, "offset": _trace_offset(), "usage": None}
+    started = time.perf_counter()
+    try:
+        yield span
+    except Exception as exc:
+        GEMINI_FAILURES.inc(call=call, error=type(exc).__name__)
+        span["error"] = repr(exc)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        GEMINI_SECONDS.observe(seconds, call=call)
+        usage = span.pop("usage")
+        if usage is not None:
+            span["prompt_tokens"] = getattr(usage, "prompt_token_count", 0) or 0
+            span["response_tokens"] = getattr(usage, "candidates_token_count", 0) or 0
+            GEMINI_TOKENS.inc(span["prompt_tokens"], call=call, kind="prompt")
+            GEMINI_TOKENS.inc(span["response_tokens"], call=call, kind="response")
+        span["seconds"] = round(seconds, 6)
+        _add_span(span)
+
+
+def cache_lookup(hit):
+    CACHE_LOOKUPS.inc(result="hit" if hit else "miss")
+    _add_span({"cache": "hit" if hit else "miss", "offset": _trace_offset()})
+
+
+_QUESTION_CACHE_RESULTS = {"exact_hits": "exact", "similar_hits": "similar", "misses": "miss"}
+
+
+# `kind` is the QuestionCache.stats key of the lookup result
+def question_cache_lookup(kind):
+    result = _QUESTION_CACHE_RESULTS[kind]
+    QUESTION_CACHE_LOOKUPS.inc(result=result)
+    _add_span({"question_cache": result, "offset": _trace_offset()})
+
+
+def degraded(kind):
+    DEGRADED.inc(kind=kind)
+
+
+# ========================= HTTP endpoint =========================
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body, content_type = render().encode(), "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/traces":
+            body, content_type = json.dumps(recent_traces(), ensure_ascii=False).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # Scrapes every few seconds would flood stderr
+        pass
+
+
+# Serve /metrics and /traces from a daemon thread; returns the server (server.server_address has the port)
+def serve(port, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="loveguru-metrics", daemon=True).start()
+    logger.info(f"📈 Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
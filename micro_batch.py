@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import gemini_client
+import vedic
+from resilience import Unavailable
+
+logger = logging.getLogger("loveguru")
+
+
+def batch_prompt(states):
+    people = "\n".join(
+        json.dumps({
+            "id": str(index), "name": state["name"], "birth_date": state["dob"],
+            "place_of_birth": state["place_of_birth"], "zodiac": state["zodiac_sign"],
+            "numerology": state["numerology_number"], "vedic": vedic.describe_chart(state.get("vedic_chart")),
+        }, ensure_ascii=False)
+        for index, state in enumerate(states)
+    )
+    return (
+        f"You are an expert astrologer. For EACH person below give a **short** prediction (6-8 lines) "
+        f"focusing ONLY on **love, marriage, and relationships**. Keep every response funny and more in "
+        f"context of India, try using bullet points and adding emojis wherever possible.\n\n"
+        f"People (one JSON object per line):\n{people}\n\n"
+        f'Reply with ONLY a JSON object of the form {{"readings": [{{"id": "<id>", "prediction": "<text>"}}]}} '
+        f"with exactly one reading per id."
+    )
+
+
+# Parse the batch reply into {id: prediction}; raises ValueError if it is not the expected JSON
+def parse_batch_reply(text):
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    readings = json.loads(text)["readings"]
+    if not isinstance(readings, list):
+        raise ValueError("readings is not a list")
+    return {
+        str(reading["id"]): str(reading["prediction"]).strip()
+        for reading in readings if isinstance(reading, dict) and "id" in reading and reading.get("prediction")
+    }
+
+
+# Opt-in micro-batching for burst traffic: requests arriving within `window_seconds` (or up to
+# `max_batch` of them) share one structured multi-user prompt. Readings missing from the JSON reply
+# fall back to individual `single_call(state)` requests, made concurrently. Every request is answered
+# (or fails with Unavailable) within `timeout` seconds.
+class MicroBatcher:
+    def __init__(self, single_call, window_seconds=0.02, max_batch=16, senders=4, timeout=120.0):
+        self.single_call = single_call
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._pending = []  # (state, future)
+        self._ready = threading.Condition()
+        self._senders = ThreadPoolExecutor(max_workers=senders, thread_name_prefix="micro-batch")
+        # Enough for every sender to fall back on a whole batch at once
+        self._fallbacks = ThreadPoolExecutor(max_workers=senders * max_batch, thread_name_prefix="micro-batch-single")
+        self.stats = {"requests": 0, "batches": 0, "batched_requests": 0, "singles": 0, "fallbacks": 0}
+        threading.Thread(target=self._collect, name="micro-batch-collector", daemon=True).start()
+
+    def submit(self, state):
+        future = Future()
+        with self._ready:
+            self._pending.append((state, future))
+            self.stats["requests"] += 1
+            self._ready.notify()
+        return future
+
+    def predict(self, state):
+        try:
+            return self.submit(state).result(self.timeout)
+        except FutureTimeout:
+            raise Unavailable(f"micro-batch reply took over {self.timeout:g}s") from None
+
+    async def apredict(self, state):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self.submit(state)), self.timeout)
+        except asyncio.TimeoutError:
+            raise Unavailable(f"micro-batch reply took over {self.timeout:g}s") from None
+
+    def _collect(self):
+        while True:
+            with self._ready:
+                while not self._pending:
+                    self._ready.wait()
+                # The first request opens the window; a full batch closes it early
+                closes_at = time.monotonic() + self.window_seconds
+                while len(self._pending) < self.max_batch and time.monotonic() < closes_at:
+                    self._ready.wait(closes_at - time.monotonic())
+                batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch:]
+            self._senders.submit(self._send, batch)
+
+    def _send(self, batch):
+        try:
+            self._send_batch(batch)
+        finally:
+            # Whatever went wrong, no caller is left waiting
+            for _, future in batch:
+                _settle(future, exc=Unavailable("micro-batch sender failed"))
+
+    def _send_batch(self, batch):
+        if len(batch) == 1:
+            self._resolve_individually(batch, "singles")
+            return
+        states = [state for state, _ in batch]
+        try:
+            readings = parse_batch_reply(gemini_client.generate_text(
+                batch_prompt(states), json_output=True, max_output_tokens=400 * len(states)
+            ))
+        except Unavailable as exc:
+            # The backend is unhealthy; individual calls would fail the same way
+            for _, future in batch:
+                _settle(future, exc=exc)
+            return
+        except Exception as exc:
+            logger.warning(f"⚠️ Micro-batch reply unusable ({type(exc).__name__}: {exc}), falling back to individual calls")
+            readings = {}
+
+        with self._ready:
+            self.stats["batches"] += 1
+            self.stats["batched_requests"] += len(readings)
+        missing = []
+        for index, (state, future) in enumerate(batch):
+            if str(index) in readings:
+                _settle(future, readings[str(index)])
+            else:
+                missing.append((state, future))
+        self._resolve_individually(missing, "fallbacks")
+
+    def _resolve_one(self, state, future, counter):
+        if future.done():  # The caller timed out or was cancelled
+            return
+        with self._ready:
+            self.stats[counter] += 1
+        try:
+            _settle(future, self.single_call(state))
+        except Exception as exc:
+            _settle(future, exc=exc)
+
+    # Individual calls run side by side, each settling its caller as soon as it returns, so a batch's
+    # fallbacks take about one call rather than one per missing reading
+    def _resolve_individually(self, items, counter):
+        if len(items) == 1:
+            self._resolve_one(*items[0], counter)
+            return
+        wait([self._fallbacks.submit(self._resolve_one, state, future, counter) for state, future in items])
+
+    def snapshot(self):
+        with self._ready:
+            return {**self.stats, "pending": len(self._pending)}
+
+
+# Resolve a future unless it already is (timed-out async callers cancel theirs)
+def _settle(future, result=None, exc=None):
+    try:
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
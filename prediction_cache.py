@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Bump this whenever the astrologer prompt changes so old readings are not served
+PROMPT_VERSION = 2
+
+
+# Normalize user details into a cache key (case, extra spaces and DOB separators don't matter)
+def make_cache_key(name, dob, place_of_birth, zodiac_sign, numerology_number, time_of_birth="",
+                   prompt_version=PROMPT_VERSION):
+    def clean(value):
+        return " ".join(str(value).lower().split())
+
+    digits = "".join(ch for ch in str(dob) if ch.isdigit())
+    return "|".join([
+        clean(name), digits, clean(place_of_birth), clean(zodiac_sign),
+        str(int(numerology_number)), clean(time_of_birth), f"v{prompt_version}",
+    ])
+
+
+# Two-tier cache: in-process LRU with TTL, backed by an on-disk SQLite store
+class PredictionCache:
+    def __init__(self, db_path="prediction_cache.sqlite3", max_size=1024, ttl_seconds=7 * 24 * 3600, disk_max_size=100_000):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_size = disk_max_size
+        self._memory = OrderedDict()  # key -> (stored_at, prediction)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        self._db = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, prediction TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS predictions_stored_at ON predictions (stored_at)")
+            self._db.commit()
+
+    def _is_fresh(self, stored_at):
+        return self.ttl_seconds is None or time.time() - stored_at < self.ttl_seconds
+
+    def _remember(self, key, stored_at, prediction):
+        self._memory[key] = (stored_at, prediction)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_fresh(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+                self.stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT prediction, stored_at FROM predictions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    prediction, stored_at = row
+                    if self._is_fresh(stored_at):
+                        self._remember(key, stored_at, prediction)
+                        self.stats["hits"] += 1
+                        self.stats["disk_hits"] += 1
+                        return prediction
+                    self._db.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.stats["expired"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, prediction):
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, stored_at, prediction)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, prediction, stored_at) VALUES (?, ?, ?)",
+                    (key, prediction, stored_at),
+                )
+                # Keep the disk store capped by dropping the oldest rows
+                (count,) = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()
+                if count > self.disk_max_size:
+                    self._db.execute(
+                        "DELETE FROM predictions WHERE key IN "
+                        "(SELECT key FROM predictions ORDER BY stored_at LIMIT ?)",
+                        (count - self.disk_max_size,),
+                    )
+                    self.stats["evictions"] += count - self.disk_max_size
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._memory),
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            }
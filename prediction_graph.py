@@ -0,0 +1,265 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from typing import TypedDict
+
+import gemini_client
+import metrics
+import vedic
+from archetypes import precomputed_reading
+from astrology import numerology_number, parse_dob, zodiac_sign
+from micro_batch import MicroBatcher
+from prediction_cache import PredictionCache, make_cache_key
+from resilience import Unavailable
+
+# langgraph is slow to import, so it is imported on first use (google.generativeai is handled by gemini_client)
+
+logger = logging.getLogger("loveguru")
+
+# Stream replies chunk by chunk instead of waiting for the full text (set LOVEGURU_STREAMING=0 to disable)
+STREAMING = os.getenv("LOVEGURU_STREAMING", "1") == "1"
+
+# "live" calls Gemini (showing a precomputed reading first), "precomputed" never calls the API
+PREDICTION_MODE = os.getenv("LOVEGURU_PREDICTION_MODE", "live")
+
+# Opt-in micro-batching of initial predictions for burst traffic (LOVEGURU_MICRO_BATCH=1)
+MICRO_BATCH = os.getenv("LOVEGURU_MICRO_BATCH", "0") == "1"
+
+# Shown when Gemini is unhealthy or over quota and no precomputed reading exists (never cached)
+DEGRADED_PREDICTION = (
+    "- 🌫️ The stars are a little cloudy right now, even Shukra is stuck in traffic.\n"
+    "- 🙏 Ask LoveGuru again in a minute, the universe is recharging its balance."
+)
+
+# Define State Schema
+class PredictionState(TypedDict):
+    name: str
+    dob: str
+    place_of_birth: str  # Canonical gazetteer label when the place was recognized
+    place_id: str  # Gazetteer place id, "" for places it doesn't know
+    time_of_birth: str  # "HH:MM" local time, "" when unknown
+    zodiac_sign: str
+    numerology_number: int
+    vedic_chart: dict  # Sidereal sun/moon rashi and nakshatra names, {} for dates outside the ephemeris
+    prediction: str
+    degraded: bool  # True when the prediction is a fallback because Gemini was unavailable
+    chat_history: list
+
+# Prediction cache is shared across reruns and sessions (LRU in memory, SQLite on disk)
+_prediction_cache = None
+_prediction_cache_lock = threading.Lock()
+
+def get_prediction_cache():
+    global _prediction_cache
+    with _prediction_cache_lock:
+        if _prediction_cache is None:
+            _prediction_cache = PredictionCache(
+                db_path=os.getenv("LOVEGURU_CACHE_DB", "prediction_cache.sqlite3"),
+                max_size=int(os.getenv("LOVEGURU_CACHE_SIZE", "1024")),
+                ttl_seconds=int(os.getenv("LOVEGURU_CACHE_TTL", str(7 * 24 * 3600))),
+            )
+        return _prediction_cache
+
+# Nodes return only the keys they set, so the zodiac, numerology and vedic branches can run in parallel
+
+# Function to calculate Zodiac Sign (day-of-year lookup table shared with the batch API)
+def get_zodiac(state: PredictionState) -> dict:
+    day, month, _ = parse_dob(state["dob"])
+    return {"zodiac_sign": zodiac_sign(day, month)}
+
+# Function to calculate Numerology Number
+def get_numerology(state: PredictionState) -> dict:
+    digit_sum = sum(int(digit) for digit in state["dob"] if digit.isdigit())
+    return {"numerology_number": numerology_number(digit_sum)}
+
+# Function to calculate the Vedic chart (sidereal sun and moon signs from the memory-mapped ephemeris)
+def get_vedic_chart(state: PredictionState) -> dict:
+    zone = vedic.place_zone(state.get("place_id", ""))
+    return {"vedic_chart": vedic.vedic_chart(state["dob"], state.get("time_of_birth", ""), zone)}
+
+def _prediction_prompt(state):
+    chart = vedic.describe_chart(state.get("vedic_chart"))
+    return (
+        f"You are an expert astrologer. Based on name '{state['name']}', birth date '{state['dob']}', "
+        f"place of birth '{state['place_of_birth']}', Zodiac '{state['zodiac_sign']}', "
+        + (f"Vedic chart '{chart}', " if chart else "")
+        + f"and Numerology '{state['numerology_number']}', give a **short** prediction (6-8 lines) "
+        f"focusing ONLY on **love, marriage, and relationships**. Keep your response funny and more in context of India"
+        f"try using bullet points and adding emojis wherever possible"
+    )
+
+def _cache_key(state):
+    return make_cache_key(
+        state["name"], state["dob"], state["place_of_birth"],
+        state["zodiac_sign"], state["numerology_number"], state.get("time_of_birth", ""),
+    )
+
+# Chunks go to graph.stream(..., stream_mode="custom") callers; graph.invoke ignores them
+def _stream_writer():
+    from langgraph.config import get_stream_writer
+
+    return get_stream_writer()
+
+def _log_stream_timings(state, timings):
+    logger.info(
+        f"⏱️ Prediction for {state['name']} streamed: first token {timings['first_token']:.2f}s, "
+        f"total {timings['total']:.2f}s",
+        extra={
+            "event": "prediction_stream", "user": state["name"],
+            "first_token_ms": round(timings["first_token"] * 1000, 1), "latency_ms": round(timings["total"] * 1000, 1),
+        },
+    )
+
+# Process-wide micro-batcher; readings it can't batch fall back to the normal single-user prompt
+@functools.lru_cache(maxsize=None)
+def get_micro_batcher():
+    return MicroBatcher(
+        lambda state: gemini_client.generate_text(_prediction_prompt(state)),
+        window_seconds=float(os.getenv("LOVEGURU_MICRO_BATCH_WINDOW_MS", "20")) / 1000,
+        max_batch=int(os.getenv("LOVEGURU_MICRO_BATCH_SIZE", "16")),
+        timeout=3 * gemini_client.DEADLINE,  # The batch call plus an individual fallback call, with room to spare
+    )
+
+def _precomputed(state):
+    return precomputed_reading(
+        state["name"], state["place_of_birth"], state["zodiac_sign"], state["numerology_number"]
+    )
+
+# Blocking part of the prediction node: cache lookup (SQLite) and the precomputed pool (gzip file).
+# Returns (cache, cache_key, cached prediction or None, precomputed reading or None).
+def _lookup(state):
+    cache = get_prediction_cache()
+    cache_key = _cache_key(state)
+    cached = cache.get(cache_key)
+    metrics.cache_lookup(cached is not None)
+    if cached is not None:
+        logger.info(f"⚡ Cache hit for {state['name']}", extra={"event": "cache_hit", "cache": cache.snapshot()})
+        return cache, cache_key, cached, None
+    return cache, cache_key, None, _precomputed(state)
+
+# Shared first half of the prediction node, given _lookup's result: cached reply, precomputed-only mode
+# and the instant preview. Returns (cache, cache_key, writer, result) where result is set when no live
+# call is needed.
+def _before_live_call(state, lookup):
+    cache, cache_key, cached, precomputed = lookup
+    writer = _stream_writer()
+    if cached is not None:
+        writer({"prediction_chunk": cached})
+        return cache, cache_key, writer, {"prediction": cached}
+
+    if PREDICTION_MODE == "precomputed":
+        prediction = precomputed or DEGRADED_PREDICTION
+        writer({"prediction_chunk": prediction})
+        return cache, cache_key, writer, {"prediction": prediction, "degraded": not precomputed}
+    if precomputed:
+        # Shown right away, replaced by the live reading as it streams in
+        writer({"prediction_preview": precomputed})
+    return cache, cache_key, writer, None
+
+# A reply without text (e.g. every chunk blocked by the safety filters) is no prediction; it gets the
+# fallback and is never cached
+def _require_text(prediction):
+    if not prediction:
+        raise Unavailable("empty reply, likely blocked by safety filters")
+    return prediction
+
+def _fallback_prediction(state, exc):
+    logger.warning(f"⚠️ Degraded prediction for {state['name']}: {exc}", extra={"event": "degraded", "user": state["name"]})
+    metrics.degraded("prediction")
+    return {"prediction": _precomputed(state) or DEGRADED_PREDICTION, "degraded": True}
+
+# Function to predict future based on Name, DOB, and Place of Birth
+def predict_relationship_future(state: PredictionState) -> dict:
+    cache, cache_key, writer, early = _before_live_call(state, _lookup(state))
+    if early is not None:
+        return early
+
+    prompt = _prediction_prompt(state)
+    try:
+        if MICRO_BATCH:
+            # Batched replies arrive whole, so they are emitted as one chunk
+            prediction = get_micro_batcher().predict(state)
+            writer({"prediction_chunk": prediction})
+        elif STREAMING:
+            timings = {}
+            chunks = []
+            for text in gemini_client.stream_text(prompt, timings):
+                chunks.append(text)
+                writer({"prediction_chunk": text})
+            prediction = "".join(chunks).strip()
+            _log_stream_timings(state, timings)
+        else:
+            prediction = gemini_client.generate_text(prompt)
+        _require_text(prediction)
+    except Unavailable as exc:
+        return _fallback_prediction(state, exc)
+    cache.put(cache_key, prediction)
+    return {"prediction": prediction}
+
+# Async variant of predict_relationship_future, used by graph.ainvoke / graph.astream.
+# Cache and pool file I/O run in a worker thread, so they don't stall other requests on the event loop.
+async def apredict_relationship_future(state: PredictionState) -> dict:
+    cache, cache_key, writer, early = _before_live_call(state, await asyncio.to_thread(_lookup, state))
+    if early is not None:
+        return early
+
+    prompt = _prediction_prompt(state)
+    try:
+        if MICRO_BATCH:
+            prediction = await get_micro_batcher().apredict(state)
+            writer({"prediction_chunk": prediction})
+        elif STREAMING:
+            timings = {}
+            chunks = []
+            async for text in gemini_client.astream_text(prompt, timings):
+                chunks.append(text)
+                writer({"prediction_chunk": text})
+            prediction = "".join(chunks).strip()
+            _log_stream_timings(state, timings)
+        else:
+            prediction = await gemini_client.agenerate_text(prompt)
+        _require_text(prediction)
+    except Unavailable as exc:
+        return await asyncio.to_thread(_fallback_prediction, state, exc)
+    await asyncio.to_thread(cache.put, cache_key, prediction)
+    return {"prediction": prediction}
+
+# Wrap a node so graph.invoke calls `func` and graph.ainvoke awaits `afunc`, both timed by metrics.
+# Cheap sync nodes get an inline async version so ainvoke doesn't hand them to a thread pool.
+def _node(func, afunc=None):
+    from langchain_core.runnables import RunnableLambda
+
+    if afunc is None:
+        async def afunc(state):
+            return func(state)
+    name = func.__name__
+    return RunnableLambda(
+        metrics.instrument_node(name, func), afunc=metrics.instrument_anode(name, afunc), name=name
+    )
+
+# Build and compile the LangGraph: zodiac, numerology and the vedic chart run as parallel branches
+# that fan in to the prediction node
+def build_graph():
+    from langgraph.graph import START, StateGraph
+
+    graph = StateGraph(PredictionState)
+    graph.add_node("get_zodiac", _node(get_zodiac))
+    graph.add_node("get_numerology", _node(get_numerology))
+    graph.add_node("get_vedic_chart", _node(get_vedic_chart))
+    graph.add_node("predict_relationship_future", _node(predict_relationship_future, apredict_relationship_future))
+    graph.add_edge(START, "get_zodiac")
+    graph.add_edge(START, "get_numerology")
+    graph.add_edge(START, "get_vedic_chart")
+    graph.add_edge(["get_zodiac", "get_numerology", "get_vedic_chart"], "predict_relationship_future")
+    return graph.compile()
+
+# Process-wide compiled graph
+@functools.lru_cache(maxsize=None)
+def get_compiled_graph():
+    return build_graph()
+
+# Async entry point: one event loop can serve many concurrent predictions without a thread each
+async def ainvoke_prediction(state: PredictionState, graph=None) -> PredictionState:
+    return await (graph or get_compiled_graph()).ainvoke(state)
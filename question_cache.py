@@ -0,0 +1,236 @@
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+# Answers to common chat questions, shared by users with the same zodiac sign and numerology number.
+# Questions match exactly after normalization, or approximately through MinHash signatures of their
+# character shingles ("when will I get married?" ~ "when will i get marry"), provided their numbers, months
+# and names agree ("married in 2025?" is not "married in 2026?"). Answers are stored with the asker's name
+# swapped for a placeholder and handed back with the new user's name; an answer that still mentions
+# anything else from the asker's profile (birthplace, birth date or time, vedic chart) is not cached.
+
+SHINGLE_CHARS = 4
+SIGNATURE_SIZE = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+_permutations = random.Random(7).sample(range(1, _MERSENNE_PRIME), 2 * SIGNATURE_SIZE)
+PERMUTATIONS = list(zip(_permutations[::2], _permutations[1::2]))
+
+# Questions that lean on the earlier conversation can't be answered from another user's chat
+FOLLOW_UP_WORDS = {"it", "that", "this", "those", "these", "he", "she", "him", "her", "they", "them", "above", "again", "more", "why"}
+
+NAME_PLACEHOLDER = "\x00name\x00"
+FIRST_NAME_PLACEHOLDER = "\x00first_name\x00"
+MONTH_NAMES = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+
+
+def normalize_question(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def is_standalone(question):
+    return not FOLLOW_UP_WORDS.intersection(normalize_question(question).split())
+
+
+# Words that change the answer however similar the rest of the question is: numbers, month names, and
+# names (capitalised words other than "I" and the first word of a sentence), lowercased
+def key_tokens(question):
+    tokens = {str(int(number)) for number in re.findall(r"\d+", question)}
+    for match in re.finditer(r"[^\W\d_]+", question):
+        word, before = match.group(), question[: match.start()].rstrip()
+        starts_sentence = not before or before[-1] in ".!?"
+        if word.lower() in MONTH_NAMES or (word[0].isupper() and word != "I" and not starts_sentence):
+            tokens.add(word.lower())
+    return frozenset(tokens)
+
+
+# Case-insensitive pattern matching any of `words` as whole words (so "Ana" doesn't match "Ananya")
+def _words_pattern(words):
+    words = sorted({" ".join(word.split()) for word in words if len(word.strip()) >= 2}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile(r"(?<!\w)(?:" + "|".join(re.escape(word).replace(r"\ ", r"\s+") for word in words) + r")(?!\w)", re.I)
+
+
+# Profile details other than the name that must not reach another user: name parts, birthplace (all
+# but the country), birth date in its usual spellings, birth time and the vedic chart names
+def _profile_pattern(user_info):
+    words = (user_info.get("name") or "").split()
+    words += [part.strip() for part in (user_info.get("place_of_birth") or "").split(",")[:-1]] or [
+        user_info.get("place_of_birth") or ""
+    ]
+    if user_info.get("time_of_birth"):
+        words.append(user_info["time_of_birth"])
+    chart = user_info.get("vedic_chart") or {}
+    words += [chart[key] for key in ("sun_rashi", "moon_rashi", "nakshatra") if chart.get(key)]
+    dates = []
+    digits = re.findall(r"\d+", user_info.get("dob") or "")
+    if len(digits) == 3:
+        day, month, year = (int(part) for part in digits)
+        words.append(str(year))
+        # 22-02-2000, 22/2/2000, 22nd Feb, 22 of February, February 22nd ...
+        dates.append(r"(?<!\d)0*{}\s*[-/.]\s*0*{}\s*[-/.]\s*{}(?!\d)".format(day, month, year))
+        if 1 <= month <= 12:
+            day_text, month_text = rf"(?<!\d)0*{day}(?:st|nd|rd|th)?", rf"\b{MONTH_NAMES[month - 1][:3]}[a-z]*\.?"
+            dates += [rf"{day_text}\s+(?:of\s+)?{month_text}", rf"{month_text}\s+{day_text}(?!\d)"]
+    pattern = _words_pattern(words)
+    if dates:
+        pattern = re.compile("|".join(dates + ([pattern.pattern] if pattern else [])), re.I)
+    return pattern
+
+
+# Answer with the name replaced by placeholders, or None if it still carries other profile details
+def answer_template(answer, user_info):
+    name = " ".join((user_info.get("name") or "").split())
+    template = answer
+    for placeholder, word in ((NAME_PLACEHOLDER, name), (FIRST_NAME_PLACEHOLDER, name.split()[0] if name else "")):
+        pattern = _words_pattern([word])
+        if pattern is not None:
+            template = pattern.sub(placeholder, template)
+    profile = _profile_pattern(user_info)
+    if profile is not None and profile.search(template):
+        return None
+    return template
+
+
+def _shingles(normalized):
+    padded = f" {normalized} "
+    return {padded[start:start + SHINGLE_CHARS] for start in range(max(1, len(padded) - SHINGLE_CHARS + 1))}
+
+
+# MinHash signature: for each of SIGNATURE_SIZE hash permutations, the smallest shingle hash
+def signature(normalized):
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in _shingles(normalized)]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+
+# Estimated Jaccard similarity of the two shingle sets
+def similarity(first, second):
+    return sum(x == y for x, y in zip(first, second)) / SIGNATURE_SIZE
+
+
+class _Entry:
+    __slots__ = ("profile", "normalized", "keys", "signature", "answer", "stored_at", "served")
+
+    def __init__(self, profile, normalized, keys, signature, answer, stored_at):
+        self.profile = profile
+        self.normalized = normalized
+        self.keys = keys
+        self.signature = signature
+        self.answer = answer
+        self.stored_at = stored_at
+        self.served = 0
+
+
+# In-process cache with LRU eviction. Freshness: entries expire after ttl_seconds, and after serving
+# max_serves users, so popular questions get a newly generated answer every so often.
+class QuestionCache:
+    def __init__(self, max_size=2048, ttl_seconds=24 * 3600, max_serves=25, threshold=0.6, per_profile=64):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_serves = max_serves
+        self.threshold = threshold
+        self.per_profile = per_profile
+        self._entries = OrderedDict()  # (profile, normalized question) -> _Entry, least recently used first
+        self._by_profile = {}  # profile -> {normalized question: _Entry}, scanned for similar questions
+        self._lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0, "stores": 0, "personal": 0, "evictions": 0, "expired": 0}
+
+    def _drop(self, entry):
+        self._entries.pop((entry.profile, entry.normalized), None)
+        profile_entries = self._by_profile.get(entry.profile, {})
+        profile_entries.pop(entry.normalized, None)
+        if not profile_entries:
+            self._by_profile.pop(entry.profile, None)
+
+    def _is_fresh(self, entry, now):
+        return now - entry.stored_at < self.ttl_seconds and entry.served < self.max_serves
+
+    def _find(self, profile, normalized, keys):
+        entry = self._entries.get((profile, normalized))
+        if entry is not None:
+            return entry, "exact_hits"
+        query = signature(normalized)
+        best, best_score = None, self.threshold
+        for candidate in self._by_profile.get(profile, {}).values():
+            if candidate.keys != keys:
+                continue
+            score = similarity(query, candidate.signature)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best, "similar_hits"
+
+    # Cached answer for this profile and question, personalized with `name`; None on a miss
+    def get(self, zodiac_sign, numerology_number, question, name):
+        profile = (zodiac_sign, int(numerology_number))
+        normalized = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            entry, kind = self._find(profile, normalized, key_tokens(question)) if normalized else (None, "misses")
+            if entry is not None and not self._is_fresh(entry, now):
+                self._drop(entry)
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                kind = "misses"
+            self.stats[kind] += 1
+            metrics.question_cache_lookup(kind)
+            if entry is None:
+                return None
+            entry.served += 1
+            self._entries.move_to_end((entry.profile, entry.normalized))
+            first_name = name.split()[0] if name.split() else name
+            return entry.answer.replace(NAME_PLACEHOLDER, name).replace(FIRST_NAME_PLACEHOLDER, first_name)
+
+    # Store an answer given to the user described by `user_info` (name, place_of_birth, dob, ...)
+    def put(self, zodiac_sign, numerology_number, question, user_info, answer):
+        normalized = normalize_question(question)
+        if not normalized or not is_standalone(question):
+            return
+        template = answer_template(answer, user_info)
+        if template is None:
+            with self._lock:
+                self.stats["personal"] += 1
+            return
+        profile = (zodiac_sign, int(numerology_number))
+        entry = _Entry(profile, normalized, key_tokens(question), signature(normalized), template, time.time())
+        with self._lock:
+            old = self._entries.get((profile, normalized))
+            if old is not None:
+                self._drop(old)
+            self._entries[(profile, normalized)] = entry
+            profile_entries = self._by_profile.setdefault(profile, {})
+            profile_entries[normalized] = entry
+            self.stats["stores"] += 1
+            # Bound the similarity scan per profile, then the whole cache
+            if len(profile_entries) > self.per_profile:
+                oldest = min(profile_entries.values(), key=lambda item: item.stored_at)
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+            while len(self._entries) > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._drop(evicted)
+                self.stats["evictions"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits = self.stats["exact_hits"] + self.stats["similar_hits"]
+            lookups = hits + self.stats["misses"]
+            return {**self.stats, "size": len(self._entries), "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+
+
+def from_env():
+    return QuestionCache(
+        max_size=int(os.getenv("LOVEGURU_QA_CACHE_SIZE", "2048")),
+        ttl_seconds=float(os.getenv("LOVEGURU_QA_CACHE_TTL", str(24 * 3600))),
+        max_serves=int(os.getenv("LOVEGURU_QA_CACHE_MAX_SERVES", "25")),
+        threshold=float(os.getenv("LOVEGURU_QA_SIMILARITY", "0.6")),
+    )
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger("loveguru")
+
+# Error class names (anywhere in the exception's MRO) worth retrying: quota throttles, timeouts, 5xx
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "GatewayTimeout", "RetryError", "TimeoutError", "ConnectionError",
+}
+
+
+# Raised when a call fails fast or gives up; callers answer with a degraded reply
+class Unavailable(Exception):
+    pass
+
+
+def is_retryable(exc):
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(exc).__mro__)
+
+
+# Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# Client-side token bucket sized to the API quota (rate per second, with a burst allowance)
+class TokenBucket:
+    def __init__(self, rate_per_second, burst):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Reserve one token; returns how long to wait for it, or None if that is longer than `max_wait`
+    def reserve(self, max_wait):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+# Opens after `failure_threshold` consecutive failures and fails fast for `reset_timeout` seconds,
+# then lets a single trial call through (half-open) to decide whether to close again
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    # The admitted call never reached the backend; let another call be the half-open trial
+    def release(self):
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"🚧 Circuit opened after {self._failures} failures")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+# Rate limit + bounded retries with jittered backoff + per-request deadline + circuit breaker.
+# Each `attempt(timeout)` callable receives the time left for that attempt.
+class CallPolicy:
+    def __init__(self, limiter, breaker, max_attempts=3, deadline_seconds=45.0, attempt_timeout=30.0):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self.deadline_seconds = deadline_seconds
+        self.attempt_timeout = attempt_timeout
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "rejected_open": 0, "rejected_rate": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    # Breaker check and rate-limit reservation; returns (delay before attempting, attempt timeout)
+    def _admit(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise Unavailable("deadline exceeded")
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise Unavailable("circuit open")
+        wait = self.limiter.reserve(max_wait=remaining)
+        if wait is None:
+            self._count("rejected_rate")
+            self.breaker.release()
+            raise Unavailable("rate limit wait exceeds deadline")
+        return wait, min(self.attempt_timeout, remaining - wait)
+
+    # Decide what to do after a failed attempt; returns the backoff delay or raises Unavailable
+    def _after_failure(self, exc, attempt, deadline, retry_allowed=True):
+        retryable = is_retryable(exc)
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        delay = backoff_delay(attempt)
+        if not (retryable and retry_allowed) or attempt + 1 >= self.max_attempts \
+                or time.monotonic() + delay >= deadline:
+            self._count("failures")
+            raise Unavailable(f"{type(exc).__name__}: {exc}") from exc
+        self._count("retries")
+        logger.warning(f"🔁 Retrying Gemini call after {type(exc).__name__} (attempt {attempt + 1})")
+        return delay
+
+    def call(self, attempt_fn):
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_seconds
+        for attempt in range(self.max_attempts):
+            wait, timeout = self._admit(deadline)
+            time.sleep(wait)
+            try:
+                result = attempt_fn(timeout)
+            except Exception as exc:
+                time.sleep(self._after_failure(exc, attempt, deadline))
+                continue
+            except BaseException:
+                self._abandoned(False)
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, attempt_fn):
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_seconds
+        for attempt in range(self.max_attempts):
+            wait, timeout = self._admit(deadline)
+            await asyncio.sleep(wait)
+            try:
+                result = await attempt_fn(timeout)
+            except Exception as exc:
+                await asyncio.sleep(self._after_failure(exc, attempt, deadline))
+                continue
+            except BaseException:
+                self._abandoned(False)
+                raise
+            self.breaker.record_success()
+            return result
+
+    # The consumer gave up mid-call (closed stream, Streamlit rerun, cancelled task): not the backend's
+    # fault, but the outcome must still be recorded so a half-open trial slot is never left taken
+    def _abandoned(self, yielded):
+        if yielded:
+            self.breaker.record_success()
+        else:
+            self.breaker.release()
+
+    # Streaming: retried only while nothing has been yielded yet
+    def stream(self, attempt_fn):
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_seconds
+        for attempt in range(self.max_attempts):
+            wait, timeout = self._admit(deadline)
+            time.sleep(wait)
+            yielded = False
+            try:
+                for item in attempt_fn(timeout):
+                    yielded = yielded or bool(item)
+                    yield item
+            except Exception as exc:
+                time.sleep(self._after_failure(exc, attempt, deadline, retry_allowed=not yielded))
+                continue
+            except BaseException:
+                self._abandoned(yielded)
+                raise
+            self.breaker.record_success()
+            return
+
+    async def astream(self, attempt_fn):
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_seconds
+        for attempt in range(self.max_attempts):
+            wait, timeout = self._admit(deadline)
+            await asyncio.sleep(wait)
+            yielded = False
+            try:
+                async for item in attempt_fn(timeout):
+                    yielded = yielded or bool(item)
+                    yield item
+            except Exception as exc:
+                await asyncio.sleep(self._after_failure(exc, attempt, deadline, retry_allowed=not yielded))
+                continue
+            except BaseException:
+                self._abandoned(yielded)
+                raise
+            self.breaker.record_success()
+            return
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "circuit": self.breaker.state}
@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import metrics
+
+# Per-process, memory-bounded home for each session's profile, prediction and chat history.
+# st.session_state only keeps the session id, so a session's memory can be reclaimed here:
+#   - history turns are slotted records with interned role tags; all but the newest few are zlib-compressed
+#   - sessions idle for spill_after seconds (or the least recently used ones, while over the memory
+#     budget) are spilled to a compressed file on disk and reloaded on their next rerun
+#   - sessions idle for idle_ttl seconds are dropped, from memory and disk
+
+logger = logging.getLogger("loveguru")
+
+ROLES = {role: sys.intern(role) for role in ("user", "bot")}
+COMPRESS_MIN_CHARS = 200  # Shorter texts don't shrink enough to pay for the decompression
+
+
+class Turn:
+    __slots__ = ("role", "_text", "_packed")
+
+    def __init__(self, role, text):
+        self.role = ROLES.get(role) or sys.intern(role)
+        self._text = text
+        self._packed = None
+
+    @property
+    def text(self):
+        return self._text if self._packed is None else zlib.decompress(self._packed).decode()
+
+    def pack(self):
+        if self._packed is None and len(self._text) >= COMPRESS_MIN_CHARS:
+            self._packed = zlib.compress(self._text.encode(), 6)
+            self._text = None
+
+    def nbytes(self):
+        return Turn._SIZE + sys.getsizeof(self._text if self._packed is None else self._packed)
+
+
+Turn._SIZE = sys.getsizeof(Turn("user", ""))
+
+
+# List-like chat history of {"role", "text"} dicts (built on access); only the newest
+# `plain_turns` are kept as plain text
+class ChatHistory:
+    def __init__(self, messages=(), plain_turns=8):
+        self.plain_turns = plain_turns
+        self._turns = []
+        self._nbytes = 0
+        self.extend(messages)
+
+    def append(self, message):
+        turn = Turn(message["role"], message["text"])
+        self._turns.append(turn)
+        self._nbytes += turn.nbytes()
+        if len(self._turns) > self.plain_turns:
+            old = self._turns[-self.plain_turns - 1]
+            before = old.nbytes()
+            old.pack()
+            self._nbytes += old.nbytes() - before
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def __len__(self):
+        return len(self._turns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [{"role": turn.role, "text": turn.text} for turn in self._turns[index]]
+        turn = self._turns[index]
+        return {"role": turn.role, "text": turn.text}
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def nbytes(self):
+        return sys.getsizeof(self._turns) + self._nbytes
+
+
+class Session:
+    __slots__ = ("session_id", "user_info", "prediction", "history", "last_seen")
+
+    def __init__(self, session_id, user_info=None, prediction="", history=(), plain_turns=8):
+        self.session_id = session_id
+        self.user_info = user_info
+        self.prediction = prediction
+        self.history = ChatHistory(history, plain_turns)
+        self.last_seen = time.monotonic()
+
+    def nbytes(self):
+        profile = json.dumps(self.user_info, ensure_ascii=False) if self.user_info else ""
+        return sys.getsizeof(self) + sys.getsizeof(profile) + sys.getsizeof(self.prediction) + self.history.nbytes()
+
+    def to_json(self):
+        return {"user_info": self.user_info, "prediction": self.prediction, "chat_history": self.history[:]}
+
+
+class SessionManager:
+    def __init__(self, spill_dir="session_spill", memory_budget_bytes=256 << 20, spill_after=600,
+                 idle_ttl=6 * 3600, plain_turns=8, sweep_interval=30):
+        self.spill_dir = spill_dir
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_after = spill_after
+        self.idle_ttl = idle_ttl
+        self.plain_turns = plain_turns
+        self.sweep_interval = sweep_interval
+        self._sessions = OrderedDict()  # session id -> Session, least recently used first
+        self._sizes = {}  # session id -> bytes, as of its last rerun
+        self._total_bytes = 0
+        self._spilled = {}  # session id -> last_seen
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.stats = {"created": 0, "restored": 0, "spilled": 0, "reloaded": 0, "evicted": 0}
+
+    def _spill_path(self, session_id):
+        return os.path.join(self.spill_dir, f"{session_id}.json.z")
+
+    def _spill(self, session):
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self._spill_path(session.session_id), "wb") as f:
+                f.write(zlib.compress(json.dumps(session.to_json(), ensure_ascii=False).encode(), 6))
+        except OSError as exc:
+            logger.warning(f"⚠️ Could not spill session {session.session_id}: {exc}")
+            return False
+        self._drop(session.session_id)
+        self._spilled[session.session_id] = session.last_seen
+        self.stats["spilled"] += 1
+        return True
+
+    def _reload(self, session_id):
+        path = self._spill_path(session_id)
+        try:
+            with open(path, "rb") as f:
+                data = json.loads(zlib.decompress(f.read()))
+            os.remove(path)
+        except (OSError, ValueError, zlib.error) as exc:
+            logger.warning(f"⚠️ Could not reload spilled session {session_id}: {exc}")
+            return None
+        self.stats["reloaded"] += 1
+        return data
+
+    def _evict_spilled(self, session_id):
+        self._spilled.pop(session_id, None)
+        try:
+            os.remove(self._spill_path(session_id))
+        except OSError:
+            pass
+
+    def _drop(self, session_id):
+        self._sessions.pop(session_id)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+
+    def _add(self, session_id, data):
+        session = Session(session_id, data["user_info"], data["prediction"], data["chat_history"], self.plain_turns)
+        self._sessions[session_id] = session
+        return session
+
+    # The session, from memory, the spill directory or `restore(session_id)` (e.g. a session store's
+    # load, returning {"user_info", "prediction", "chat_history"} or None); None if unknown
+    def get(self, session_id, restore=None):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None and session_id in self._spilled:
+                self._spilled.pop(session_id)
+                data = self._reload(session_id)
+                session = data and self._add(session_id, data)
+            if session is None and restore is not None:
+                data = restore(session_id)
+                if data is not None:
+                    session = self._add(session_id, data)
+                    self.stats["restored"] += 1
+            if session is not None:
+                session.last_seen = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def create(self, session_id):
+        with self._lock:
+            session = self._add(session_id, {"user_info": None, "prediction": "", "chat_history": ()})
+            self.stats["created"] += 1
+            return session
+
+    # Record the session's size after a rerun, then spill/evict others if a sweep is due or memory is over budget
+    def release(self, session):
+        with self._lock:
+            if self._sessions.get(session.session_id) is not session:
+                # Spilled by another rerun's sweep while this one was using it; this copy is the latest
+                self._evict_spilled(session.session_id)
+                self._sessions[session.session_id] = session
+            size = session.nbytes()
+            self._total_bytes += size - self._sizes.get(session.session_id, 0)
+            self._sizes[session.session_id] = size
+            now = time.monotonic()
+            if self._total_bytes > self.memory_budget_bytes or now - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = now
+                self._sweep(now, keep=session.session_id)
+            metrics.SESSIONS.set(len(self._sessions), state="memory")
+            metrics.SESSIONS.set(len(self._spilled), state="disk")
+            metrics.SESSION_BYTES.set(self._total_bytes)
+
+    def _sweep(self, now, keep):
+        for session_id, last_seen in list(self._spilled.items()):
+            if now - last_seen >= self.idle_ttl:
+                self._evict_spilled(session_id)
+                self.stats["evicted"] += 1
+        for session in list(self._sessions.values()):  # Least recently used first
+            if session.session_id == keep:
+                continue
+            idle = now - session.last_seen
+            if idle >= self.idle_ttl:
+                self._drop(session.session_id)
+                self.stats["evicted"] += 1
+            elif idle >= self.spill_after or self._total_bytes > self.memory_budget_bytes:
+                self._spill(session)
+
+    # Memory held per session and in total, for sizing pods
+    def report(self, top=10):
+        with self._lock:
+            sizes = {session_id: session.nbytes() for session_id, session in self._sessions.items()}
+            largest = sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:top]
+            return {
+                **self.stats,
+                "in_memory": len(sizes),
+                "on_disk": len(self._spilled),
+                "total_bytes": sum(sizes.values()),
+                "budget_bytes": self.memory_budget_bytes,
+                "mean_bytes": round(sum(sizes.values()) / len(sizes)) if sizes else 0,
+                "largest": [
+                    {"session_id": session_id, "bytes": size, "turns": len(self._sessions[session_id].history)}
+                    for session_id, size in largest
+                ],
+            }
+
+
+def from_env():
+    return SessionManager(
+        spill_dir=os.getenv("LOVEGURU_SESSION_SPILL_DIR", "session_spill"),
+        memory_budget_bytes=int(float(os.getenv("LOVEGURU_SESSION_MEMORY_MB", "256")) * (1 << 20)),
+        spill_after=float(os.getenv("LOVEGURU_SESSION_SPILL_AFTER", "600")),
+        idle_ttl=float(os.getenv("LOVEGURU_SESSION_IDLE_TTL", str(6 * 3600))),
+        plain_turns=int(os.getenv("LOVEGURU_SESSION_PLAIN_TURNS", "8")),
+    )
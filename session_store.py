@@ -0,0 +1,183 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Session persistence outside st.session_state, so a conversation survives a restart and can be picked
+# up by any replica (the session id travels in the page URL). Stores:
+#   memory               no store: session_memory is the only copy, and it dies with the process (the default)
+#   sqlite:<path>        a SQLite file shared by every process that can reach it, written behind the request
+# Chat history is appended as compact (role, text) records; nothing is rewritten after the fact.
+
+ROLE_CODES = {"user": "u", "bot": "b"}
+ROLE_NAMES = {code: role for role, code in ROLE_CODES.items()}
+
+
+# The "memory" backend: a no-op. This process's sessions live only in session_memory.SessionManager,
+# which bounds their memory and evicts idle ones for good; a second, unbounded copy here would undo that.
+# Nothing is persisted, so a session is gone after eviction or a restart.
+class NullSessionStore:
+    def load(self, session_id):
+        return None
+
+    def save_profile(self, session_id, user_info, prediction):
+        pass
+
+    def append_messages(self, session_id, messages):
+        pass
+
+    def flush(self):
+        pass
+
+    def snapshot(self):
+        return {"backend": "memory"}
+
+
+class SQLiteSessionStore:
+    def __init__(self, db_path):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")  # Readers in other processes don't block the writer
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, user_info TEXT, prediction TEXT, updated_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, role TEXT NOT NULL, text TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)")
+        self._db.commit()
+
+    def load(self, session_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT user_info, prediction FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            messages = self._db.execute(
+                "SELECT role, text FROM messages WHERE session_id = ? ORDER BY id", (session_id,)
+            ).fetchall()
+        return {
+            "user_info": json.loads(row[0]) if row[0] else None,
+            "prediction": row[1] or "",
+            "chat_history": [{"role": ROLE_NAMES.get(role, role), "text": text} for role, text in messages],
+        }
+
+    # Apply a batch of ("profile" | "messages", session_id, payload) writes in one transaction
+    def write_batch(self, writes):
+        now = time.time()
+        with self._lock, self._db:
+            for kind, session_id, payload in writes:
+                if kind == "profile":
+                    user_info, prediction = payload
+                    self._db.execute(
+                        "INSERT INTO sessions (session_id, user_info, prediction, updated_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(session_id) DO UPDATE SET user_info = excluded.user_info, "
+                        "prediction = excluded.prediction, updated_at = excluded.updated_at",
+                        (session_id, json.dumps(user_info, ensure_ascii=False), prediction, now),
+                    )
+                else:
+                    self._db.executemany(
+                        "INSERT INTO messages (session_id, role, text) VALUES (?, ?, ?)",
+                        [(session_id, ROLE_CODES.get(m["role"], m["role"]), m["text"]) for m in payload],
+                    )
+                    self._db.execute("UPDATE sessions SET updated_at = ? WHERE session_id = ?", (now, session_id))
+
+    def save_profile(self, session_id, user_info, prediction):
+        self.write_batch([("profile", session_id, (user_info, prediction))])
+
+    def append_messages(self, session_id, messages):
+        self.write_batch([("messages", session_id, list(messages))])
+
+    def flush(self):
+        pass
+
+    def snapshot(self):
+        with self._lock:
+            sessions, messages = self._db.execute(
+                "SELECT (SELECT COUNT(*) FROM sessions), (SELECT COUNT(*) FROM messages)"
+            ).fetchone()
+        return {"backend": "sqlite", "sessions": sessions, "messages": messages}
+
+
+# Queues writes and applies them from a background thread in batched transactions, so the request
+# thread never waits on disk. A write reaches the store within flush_interval (sooner once max_batch
+# writes are queued). load() flushes first, so a session always reads its own writes.
+class WriteBehindStore:
+    def __init__(self, store, flush_interval=0.2, max_batch=500):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # One batch in flight at a time, keeping writes in order
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "largest_batch": 0, "errors": 0}
+        threading.Thread(target=self._run, name="session-store-writer", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                # Let more writes join the batch, up to flush_interval after the first one
+                self._cond.wait_for(lambda: len(self._pending) >= self.max_batch, timeout=self.flush_interval)
+            self.flush()
+
+    def _queue(self, write):
+        with self._cond:
+            self._pending.append(write)
+            self.stats["queued"] += 1
+            self._cond.notify()
+
+    def save_profile(self, session_id, user_info, prediction):
+        self._queue(("profile", session_id, (dict(user_info), prediction)))
+
+    def append_messages(self, session_id, messages):
+        self._queue(("messages", session_id, [dict(message) for message in messages]))
+
+    def flush(self):
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                self.store.write_batch(batch)
+            except sqlite3.Error:
+                with self._cond:
+                    self._pending[:0] = batch  # Retried with the next batch
+                    self.stats["errors"] += 1
+                return
+            with self._cond:
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+    def load(self, session_id):
+        self.flush()
+        return self.store.load(session_id)
+
+    def snapshot(self):
+        with self._cond:
+            return {**self.store.snapshot(), **self.stats, "pending": len(self._pending)}
+
+
+# "memory" or "sqlite:<path>" (LOVEGURU_SESSION_STORE)
+def open_store(spec="memory"):
+    backend, _, path = spec.partition(":")
+    if backend == "memory":
+        return NullSessionStore()
+    if backend == "sqlite":
+        return WriteBehindStore(
+            SQLiteSessionStore(path or "sessions.sqlite3"),
+            flush_interval=float(os.getenv("LOVEGURU_SESSION_FLUSH_MS", "200")) / 1000,
+        )
+    raise ValueError(f"Unknown session store {spec!r}, expected 'memory' or 'sqlite:<path>'")
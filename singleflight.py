@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+# Stable key for a request from its normalized parts
+def request_key(*parts):
+    normalized = "|".join(" ".join(str(part).lower().split()) for part in parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Identical requests that arrive while one is running wait for its result instead of making their own call
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.stats["calls"] += 1
+                else:
+                    self.stats["coalesced"] += 1
+
+            if leader:
+                try:
+                    call.result = fn(*args, **kwargs)
+                    return call.result
+                except BaseException as exc:
+                    call.error = exc
+                    raise
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+
+            call.done.wait()
+            if call.error is None:
+                return call.result
+            if isinstance(call.error, Exception):
+                raise call.error
+            # The leader was interrupted (e.g. a Streamlit rerun stopped its script), so try again ourselves
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls)}
+
+
+# Remembers results by idempotency key for `window_seconds`, so a repeated submission is not sent again
+class IdempotencyWindow:
+    def __init__(self, window_seconds=30, max_keys=10_000):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._results = OrderedDict()  # key -> (stored_at, result)
+        self._lock = threading.Lock()
+        self.stats = {"repeats_ignored": 0}
+
+    def _prune(self, now):
+        while self._results:
+            key, (stored_at, _) = next(iter(self._results.items()))
+            if now - stored_at < self.window_seconds and len(self._results) <= self.max_keys:
+                break
+            del self._results[key]
+
+    # Returns (True, result) if `key` was completed within the window
+    def seen(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            entry = self._results.get(key)
+            if entry is None:
+                return False, None
+            self.stats["repeats_ignored"] += 1
+            return True, entry[1]
+
+    def remember(self, key, result=None):
+        with self._lock:
+            self._results.pop(key, None)
+            self._results[key] = (time.monotonic(), result)
+            self._prune(time.monotonic())
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "keys": len(self._results)}
@@ -0,0 +1,42 @@
+import statistics
+import threading
+import time
+
+# Process-wide timings: one-off cold-start costs and per-rerun durations of app.py
+PROCESS_STARTED = time.perf_counter()
+
+_lock = threading.Lock()
+_cold_start = {}
+_reruns = []
+_MAX_RERUNS = 500
+
+
+# Run `fn` once and remember how long it took under `name` (e.g. heavy imports, graph build)
+def timed(name, fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    with _lock:
+        _cold_start[name] = time.perf_counter() - started
+    return result
+
+
+def record_rerun(seconds):
+    with _lock:
+        _reruns.append(seconds)
+        if len(_reruns) > _MAX_RERUNS:
+            del _reruns[: len(_reruns) - _MAX_RERUNS]
+
+
+def report():
+    with _lock:
+        reruns = list(_reruns)
+        cold_start = dict(_cold_start)
+    summary = {
+        "cold_start_ms": {name: round(seconds * 1000, 2) for name, seconds in cold_start.items()},
+        "reruns": len(reruns),
+    }
+    if reruns:
+        summary["first_rerun_ms"] = round(reruns[0] * 1000, 2)
+        summary["last_rerun_ms"] = round(reruns[-1] * 1000, 2)
+        summary["median_rerun_ms"] = round(statistics.median(reruns[1:] or reruns) * 1000, 2)
+    return summary
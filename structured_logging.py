@@ -0,0 +1,141 @@
+import atexit
+import contextvars
+import datetime
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import shutil
+import threading
+
+# JSON-lines logging that never blocks the caller on disk: records go onto a bounded queue and a
+# background listener formats, writes, rotates and gzips them. One line per record, e.g.
+#   {"ts": "...", "level": "INFO", "event": "bot_reply", "session_id": "...", "msg": "🤖 Bot replied to Gunjan",
+#    "user": "Gunjan", "latency_ms": 812.4, "text": "..."}
+# Structured fields are passed with `extra=`; full-text payloads go in extra["text"] and are sampled
+# (kept for LOVEGURU_LOG_PAYLOAD_RATE of records, far fewer while the queue is backing up).
+#
+# Settings:
+#   LOVEGURU_LOG_FILE                    log path (default chatbot_logs.log)
+#   LOVEGURU_LOG_MAX_BYTES               rotate when the file reaches this size (default 10 MB)
+#   LOVEGURU_LOG_ROTATE_WHEN             rotate by time instead, e.g. "midnight" or "H" (TimedRotatingFileHandler)
+#   LOVEGURU_LOG_BACKUPS                 gzipped files to keep (default 7)
+#   LOVEGURU_LOG_QUEUE                   queued records before new ones are dropped (default 10000)
+#   LOVEGURU_LOG_PAYLOAD_RATE            share of payloads kept normally (default 1.0)
+#   LOVEGURU_LOG_PAYLOAD_RATE_UNDER_LOAD share kept once the queue is a quarter full (default 0.05)
+
+# Record attributes that logging sets itself; anything else passed via extra= becomes a JSON field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "session_id", "event"}
+
+# Session id for records logged while handling a session (set once per rerun by the app)
+_session_id = contextvars.ContextVar("loveguru_session_id", default=None)
+
+stats = {"records": 0, "dropped": 0, "payloads_kept": 0, "payloads_sampled_out": 0}
+_stats_lock = threading.Lock()
+_listener = None
+_configure_lock = threading.Lock()
+
+
+def _count(key):
+    with _stats_lock:
+        stats[key] += 1
+
+
+def bind_session(session_id):
+    _session_id.set(session_id)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "event": getattr(record, "event", None) or "log",
+            "session_id": getattr(record, "session_id", None),
+            "msg": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RESERVED)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# Runs on the caller's thread: a cheap dict update, payload sampling and a non-blocking put
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, records, payload_rate, payload_rate_under_load):
+        super().__init__(records)
+        self.payload_rate = payload_rate
+        self.payload_rate_under_load = payload_rate_under_load
+        self.load_threshold = max(1, records.maxsize // 4)
+
+    def prepare(self, record):
+        if getattr(record, "session_id", None) is None:
+            record.session_id = _session_id.get()
+        text = getattr(record, "text", None)
+        if text is not None:
+            rate = self.payload_rate_under_load if self.queue.qsize() >= self.load_threshold else self.payload_rate
+            if random.random() < rate:
+                _count("payloads_kept")
+            else:
+                del record.text
+                record.text_chars = len(text)
+                _count("payloads_sampled_out")
+        return super().prepare(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            _count("records")
+        except queue.Full:
+            _count("dropped")
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _file_handler(path):
+    backups = int(os.getenv("LOVEGURU_LOG_BACKUPS", "7"))
+    when = os.getenv("LOVEGURU_LOG_ROTATE_WHEN", "")
+    if when:
+        handler = logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backups, encoding="utf-8")
+    else:
+        max_bytes = int(os.getenv("LOVEGURU_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    handler.namer = lambda name: f"{name}.gz"
+    handler.rotator = _gzip_rotator
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+# Route the root logger through the queue to the rotating JSON file; safe to call more than once
+def configure(path=None, level=logging.INFO):
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return _listener
+        records = queue.Queue(maxsize=int(os.getenv("LOVEGURU_LOG_QUEUE", "10000")))
+        handler = _NonBlockingQueueHandler(
+            records,
+            payload_rate=float(os.getenv("LOVEGURU_LOG_PAYLOAD_RATE", "1.0")),
+            payload_rate_under_load=float(os.getenv("LOVEGURU_LOG_PAYLOAD_RATE_UNDER_LOAD", "0.05")),
+        )
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(level)
+        _listener = logging.handlers.QueueListener(
+            records, _file_handler(path or os.getenv("LOVEGURU_LOG_FILE", "chatbot_logs.log"))
+        )
+        _listener.start()
+        atexit.register(_listener.stop)  # Flush what is still queued on shutdown
+        return _listener
+
+
+def snapshot():
+    with _stats_lock:
+        return dict(stats)
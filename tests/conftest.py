@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app is a flat set of modules at the repository root, and finds its data files (ephemeris.bin,
+# places.csv, ...) relative to the working directory
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
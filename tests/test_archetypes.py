@@ -0,0 +1,35 @@
+import gzip
+import json
+
+import pytest
+
+import archetypes
+
+
+def _write(path, data):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def test_load_pool_reads_current_format(tmp_path):
+    readings = {"Pisces|8": ["💍 {name} from {place} will marry soon"]}
+    path = _write(tmp_path / "pool.json.gz", {"version": archetypes.FORMAT_VERSION, "readings": readings})
+    assert archetypes.load_pool(path) == readings
+    assert archetypes.precomputed_reading("Gunjan", "Hazaribagh", "Pisces", 8, path) == (
+        "💍 Gunjan from Hazaribagh will marry soon"
+    )
+
+
+@pytest.mark.parametrize("data", [
+    [1, 2, 3],
+    "readings",
+    None,
+    {"version": archetypes.FORMAT_VERSION + 1, "readings": {}},
+    {"version": archetypes.FORMAT_VERSION, "readings": ["not", "a", "dict"]},
+    {"version": archetypes.FORMAT_VERSION},
+])
+def test_load_pool_ignores_unexpected_shapes(tmp_path, data):
+    path = _write(tmp_path / "pool.json.gz", data)
+    assert archetypes.load_pool(path) == {}
+    assert archetypes.precomputed_reading("Gunjan", "Hazaribagh", "Pisces", 8, path) is None
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import astrology
+
+
+# Tables and batch API against the original per-record code, for every date from 1900 to 2100
+def test_batch_api_matches_reference():
+    assert astrology.check_equivalence()
+
+
+@pytest.mark.parametrize("dob, sign", [
+    ("22-12-1999", "Capricorn"), ("19-01-2000", "Capricorn"), ("20-01-2000", "Aquarius"),
+    ("18-02-2000", "Aquarius"), ("19-02-2000", "Pisces"), ("29-02-2000", "Pisces"),
+    ("21-03-2000", "Aries"), ("21-12-2000", "Sagittarius"),
+])
+def test_zodiac_cusps(dob, sign):
+    day, month, _ = astrology.parse_dob(dob)
+    assert astrology.zodiac_sign(day, month) == sign
+    assert astrology.zodiac_batch([dob]).tolist() == [sign]
+
+
+@pytest.mark.parametrize("dob, number", [
+    ("22-02-2000", 8), ("29-01-1970", 11), ("29-09-1930", 33), ("01-01-2000", 4), ("09-09-1999", 1),
+])
+def test_numerology_keeps_master_numbers(dob, number):
+    assert astrology.numerology_number(sum(int(digit) for digit in dob if digit.isdigit())) == number
+    assert astrology.numerology_batch([dob]).tolist() == [number]
+
+
+def test_invalid_dates_in_batches():
+    dobs = ["31-02-2000", "29-02-1900", "1-2-2000", "not a date", ""]
+    assert astrology.zodiac_indices(dobs).tolist() == [-1, -1, astrology.ZODIAC_SIGNS.index("Aquarius"), -1, -1]
+    assert astrology.numerology_batch(dobs).tolist() == [0, 0, 5, 0, 0]
+    assert astrology.zodiac_batch(np.array(["2000-02-22", "NaT"], dtype="datetime64[D]")).tolist() == ["Pisces", ""]
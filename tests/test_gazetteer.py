@@ -0,0 +1,41 @@
+import pytest
+
+import gazetteer
+
+
+@pytest.fixture(scope="module")
+def places(tmp_path_factory):
+    return gazetteer.Gazetteer(gazetteer.build(gazetteer.PLACES_PATH, str(tmp_path_factory.mktemp("gz") / "places.idx")))
+
+
+@pytest.mark.parametrize("text, label", [
+    ("hazaribag", "Hazaribagh, Jharkhand, India"),
+    ("Hazaribagh, India", "Hazaribagh, Jharkhand, India"),
+    ("Bombay", "Mumbai, Maharashtra, India"),
+    ("Parris, France", "Paris, Ile-de-France, France"),
+])
+def test_resolve(places, text, label):
+    assert gazetteer.place_label(places.resolve(text)) == label
+
+
+@pytest.mark.parametrize("text, label", [
+    ("Hyderbad", "Hyderabad, Telangana, India"),
+    ("Hazaribag, Jharkand", "Hazaribagh, Jharkhand, India"),
+    ("Patan", "Patna, Bihar, India"),
+])
+def test_suggest(places, text, label):
+    assert places.resolve(text) is None
+    assert gazetteer.place_label(places.suggest(text)) == label
+
+
+# A qualifier naming another country or region rules a candidate out rather than being ignored
+@pytest.mark.parametrize("text", ["Hyderabad, Pakistan", "Paris, Texas", "Hazaribagh, Nepal"])
+def test_suggest_respects_qualifiers(places, text):
+    assert places.resolve(text) is None
+    assert places.suggest(text) is None
+
+
+def test_older_index_is_rebuilt(tmp_path):
+    path = tmp_path / "places.idx"
+    path.write_bytes(gazetteer.MAGIC + b"\x01\x00\x00\x00" + bytes(64))
+    assert gazetteer.get_gazetteer(str(path), gazetteer.PLACES_PATH).by_id("in-jharkhand-hazaribagh").name == "Hazaribagh"
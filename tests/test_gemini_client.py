@@ -0,0 +1,33 @@
+import pytest
+
+import gemini_client
+
+
+@pytest.fixture
+def chat():
+    gemini_client.use_backend("fake")
+    history = [{"role": "user", "parts": ["stars?"]}, {"role": "model", "parts": ["shaadi soon"]}]
+    return gemini_client.start_chat("You are LoveGuru", history)
+
+
+def test_stream_adds_the_turn_once_finished(chat):
+    reply = "".join(gemini_client.stream_chat_text(chat, "when?", {}))
+    assert reply
+    assert len(gemini_client.chat_history(chat)) == 4
+
+
+# A Streamlit rerun stops the stream mid-way with a BaseException; the chat must stay usable
+def test_abandoned_stream_leaves_no_half_turn(chat):
+    stream = gemini_client.stream_chat_text(chat, "when?", {})
+    next(stream)
+    stream.close()
+    assert len(gemini_client.chat_history(chat)) == 2
+    assert "".join(gemini_client.stream_chat_text(chat, "again?", {}))
+    assert len(gemini_client.chat_history(chat)) == 4
+
+
+def test_unfinished_turn_makes_the_history_unreadable(chat):
+    next(iter(chat.send_message("when?", stream=True)))
+    assert gemini_client.chat_history(chat) is None
+    chat.rewind()
+    assert len(gemini_client.chat_history(chat)) == 2
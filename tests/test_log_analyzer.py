@@ -0,0 +1,26 @@
+import pytest
+
+import log_analyzer
+
+
+def test_json_record():
+    epoch, entry = log_analyzer.parse_record('{"ts": "2025-02-22T06:30:00+00:00", "event": "question", "text": "hi"}')
+    assert epoch == 1740205800.0
+    assert entry["event"] == "question"
+
+
+def test_text_record():
+    _, entry = log_analyzer.parse_record("2025-02-22 06:30:00,123 - INFO - 📩 Gunjan asked: When?\nsecond line")
+    assert (entry["event"], entry["user"]) == ("question", "Gunjan")
+
+
+@pytest.mark.parametrize("record", [
+    '{"event": "question", "text": "no timestamp"}',
+    '{"ts": 1740205800, "event": "question"}',
+    '{"ts": "yesterday", "event": "question"}',
+    '{"ts": "2025-02-22T06:30:00", "event": ["question"]}',
+    '{"ts": "2025-02-22T06:30',
+    "not a log line",
+])
+def test_unusable_records_are_skipped(record):
+    assert log_analyzer.parse_record(record) is None
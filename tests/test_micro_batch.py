@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import wait
+
+import micro_batch
+
+CALL_SECONDS = 0.2
+
+
+def _batcher(monkeypatch, reply):
+    monkeypatch.setattr(micro_batch.gemini_client, "generate_text", lambda prompt, **kwargs: reply)
+
+    def single_call(state):
+        time.sleep(CALL_SECONDS)
+        return f"single {state['name']}"
+
+    return micro_batch.MicroBatcher(single_call, window_seconds=0.05, max_batch=16, timeout=5)
+
+
+def _states(count):
+    return [
+        {"name": f"user{index}", "dob": "22-02-2000", "place_of_birth": "Hazaribagh, India",
+         "zodiac_sign": "Pisces", "numerology_number": 8}
+        for index in range(count)
+    ]
+
+
+def test_parse_batch_reply_skips_unusable_readings():
+    reply = '```json\n{"readings": [{"id": 0, "prediction": " shaadi "}, {"id": "1"}, "junk"]}\n```'
+    assert micro_batch.parse_batch_reply(reply) == {"0": "shaadi"}
+
+
+def test_batched_readings_skip_single_calls(monkeypatch):
+    reply = '{"readings": [' + ", ".join(f'{{"id": "{i}", "prediction": "batched {i}"}}' for i in range(4)) + "]}"
+    batcher = _batcher(monkeypatch, reply)
+    futures = [batcher.submit(state) for state in _states(4)]
+    assert [future.result(5) for future in futures] == [f"batched {i}" for i in range(4)]
+    assert batcher.snapshot()["fallbacks"] == 0
+
+
+# An unusable reply for a full batch costs about one single call, not sixteen in a row
+def test_fallbacks_run_concurrently(monkeypatch):
+    batcher = _batcher(monkeypatch, "not json")
+    started = time.monotonic()
+    futures = [batcher.submit(state) for state in _states(16)]
+    done, _ = wait(futures, timeout=5)
+    elapsed = time.monotonic() - started
+    assert len(done) == 16
+    assert sorted(future.result() for future in futures) == sorted(f"single user{i}" for i in range(16))
+    assert batcher.snapshot()["fallbacks"] == 16
+    assert elapsed < 4 * CALL_SECONDS
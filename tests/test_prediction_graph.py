@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+import prediction_graph
+from prediction_cache import PredictionCache
+
+STATE = {
+    "name": "Gunjan", "dob": "22-02-2000", "place_of_birth": "Atlantis", "place_id": "", "time_of_birth": "",
+    "degraded": False, "chat_history": [],
+}
+
+
+# Every streamed chunk blocked by the safety filters, so the reply has no text at all
+@pytest.fixture
+def blocked_stream(tmp_path, monkeypatch):
+    cache = PredictionCache(db_path=str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(prediction_graph, "_prediction_cache", cache)
+    monkeypatch.setattr(prediction_graph, "STREAMING", True)
+    monkeypatch.setattr(prediction_graph, "MICRO_BATCH", False)
+    monkeypatch.setattr(prediction_graph, "PREDICTION_MODE", "live")
+
+    def stream_text(prompt, timings):
+        timings.update(first_token=0.0, total=0.0)
+        yield from ["", ""]
+
+    async def astream_text(prompt, timings):
+        timings.update(first_token=0.0, total=0.0)
+        for text in ["", ""]:
+            yield text
+
+    monkeypatch.setattr(prediction_graph.gemini_client, "stream_text", stream_text)
+    monkeypatch.setattr(prediction_graph.gemini_client, "astream_text", astream_text)
+    return cache
+
+
+def _check_fallback(result, cache):
+    assert result["degraded"] is True
+    assert result["prediction"]
+    assert cache.snapshot()["size"] == 0
+    assert cache.get(prediction_graph._cache_key(result)) is None
+
+
+def test_empty_stream_falls_back_uncached(blocked_stream):
+    _check_fallback(prediction_graph.build_graph().invoke(dict(STATE)), blocked_stream)
+
+
+def test_empty_async_stream_falls_back_uncached(blocked_stream):
+    graph = prediction_graph.build_graph()
+    _check_fallback(asyncio.run(prediction_graph.ainvoke_prediction(dict(STATE), graph)), blocked_stream)
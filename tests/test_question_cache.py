@@ -0,0 +1,38 @@
+import pytest
+
+import question_cache
+
+USER = {"name": "Gunjan Sharma", "dob": "22-02-2000", "place_of_birth": "Hazaribagh, India"}
+ANSWER = "😂 Gunjan, the stars say yes, after Mehta ji's son settles down."
+
+
+def _cache_with(question):
+    cache = question_cache.QuestionCache()
+    cache.put("Pisces", 8, question, USER, ANSWER)
+    return cache
+
+
+def test_similar_question_hits_with_new_name():
+    cache = _cache_with("When will I get married?")
+    assert cache.get("Pisces", 8, "when will i get marry", "Riya Verma") == (
+        "😂 Riya, the stars say yes, after Mehta ji's son settles down."
+    )
+    assert cache.snapshot()["similar_hits"] == 1
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("Will I get married in 2025?", "Will I get married in 2026?"),
+    ("Should I marry at 25?", "Should I marry at 35?"),
+    ("Will my crush Priya say yes?", "Will my crush Pooja say yes?"),
+    ("Will I find love in June?", "Will I find love in July?"),
+])
+def test_questions_differing_in_key_words_miss(stored, asked):
+    assert question_cache.similarity(
+        question_cache.signature(question_cache.normalize_question(stored)),
+        question_cache.signature(question_cache.normalize_question(asked)),
+    ) >= 0.4  # Close enough in shingles that only the key words tell them apart
+    assert _cache_with(stored).get("Pisces", 8, asked, "Riya Verma") is None
+
+
+def test_key_tokens_skip_sentence_starts_and_i():
+    assert question_cache.key_tokens("When will I marry? Will Priya agree in 2025?") == {"priya", "2025"}
@@ -0,0 +1,34 @@
+import sqlite3
+import time
+
+import session_store
+
+
+def _counts(db_path):
+    with sqlite3.connect(db_path) as db:
+        return db.execute("SELECT (SELECT COUNT(*) FROM sessions), (SELECT COUNT(*) FROM messages)").fetchone()
+
+
+# Other replicas read the file directly, so writes must land without a load() in this process
+def test_write_behind_flushes_within_interval(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    store = session_store.WriteBehindStore(session_store.SQLiteSessionStore(db_path), flush_interval=0.05)
+    store.save_profile("s1", {"name": "Gunjan"}, "prediction")
+    store.append_messages("s1", [{"role": "user", "text": "hi"}, {"role": "bot", "text": "namaste"}])
+
+    deadline = time.monotonic() + 0.05 + 1.0  # flush_interval plus scheduling slack
+    while _counts(db_path) != (1, 2) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _counts(db_path) == (1, 2)
+    assert store.snapshot()["pending"] == 0
+
+
+def test_load_reads_own_writes(tmp_path):
+    store = session_store.WriteBehindStore(
+        session_store.SQLiteSessionStore(str(tmp_path / "sessions.sqlite3")), flush_interval=60
+    )
+    store.save_profile("s1", {"name": "Gunjan"}, "prediction")
+    store.append_messages("s1", [{"role": "user", "text": "hi"}])
+    loaded = store.load("s1")
+    assert loaded["user_info"] == {"name": "Gunjan"}
+    assert loaded["chat_history"] == [{"role": "user", "text": "hi"}]
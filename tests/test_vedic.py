@@ -0,0 +1,41 @@
+import numpy as np
+
+import vedic
+
+
+# Meeus, Astronomical Algorithms, examples 25.a and 47.a (tropical, apparent)
+def test_sun_and_moon_longitudes():
+    assert abs(vedic.sun_longitude(np.array([2448908.5]))[0] - 199.9099) < 0.01
+    assert abs(vedic.moon_longitude(np.array([2448724.5]))[0] - 133.1673) < 0.01
+
+
+def test_table_interpolation_error():
+    first_jd, step_days, table = vedic.load_table()
+    jd = first_jd + np.random.default_rng(7).uniform(0, (len(table) - 1) * step_days, 50_000)
+    sun, moon, inside = vedic.table_longitudes(jd)
+    assert inside.all()
+    assert np.abs((sun - vedic.sun_longitude(jd) + 180) % 360 - 180).max() < 0.01
+    assert np.abs((moon - vedic.moon_longitude(jd) + 180) % 360 - 180).max() < 0.05
+
+
+def test_check_passes():
+    assert vedic.check()
+
+
+def test_known_chart():
+    assert vedic.vedic_chart("22-02-2000", "06:30", "Asia/Kolkata") == {
+        "sun_rashi": "Kumbha", "moon_rashi": "Kanya", "nakshatra": "Uttara Phalguni", "pada": 4,
+        "moon_certain": True,
+    }
+
+
+def test_unknown_time_uses_noon():
+    chart = vedic.vedic_chart("22-02-2000", "", "Asia/Kolkata")
+    assert (chart["nakshatra"], chart["pada"], chart["moon_certain"]) == ("Hasta", 1, True)
+
+
+def test_invalid_dates_have_no_chart():
+    assert vedic.vedic_chart("31-02-2000") == {}
+    charts = vedic.vedic_batch(["31-02-2000", "22-02-2000"], ["", "25:00"], ["Asia/Kolkata", "Not/AZone"])
+    assert charts["sun_rashi"].tolist()[0] == -1
+    assert vedic.chart_names(charts, 1)["sun_rashi"] == "Kumbha"
@@ -0,0 +1,393 @@
+import argparse
+import csv
+import datetime
+import functools
+import logging
+import os
+import struct
+import time
+import zoneinfo
+
+from astrology import parse_dobs
+
+logger = logging.getLogger("loveguru")
+
+# Vedic (sidereal, Lahiri ayanamsa) sun sign, moon sign (rashi) and nakshatra from date, time and place of birth.
+# Sun and moon come from a precomputed table of tropical longitudes every 12 hours for 1900-2100, two bytes
+# each (about 600KB), memory-mapped and linearly interpolated with numpy. The astronomy (truncated Meeus
+# series, good to a few arcminutes) only runs when the table is built.
+#   python vedic.py --build                          (re)build ephemeris.bin
+#   python vedic.py --check                          reference positions and interpolation error
+#   python vedic.py --batch users.csv charts.csv     charts for a CSV of dob, time_of_birth, place_of_birth
+# numpy is imported by the functions that use it, like the batch API in astrology.py.
+
+EPHEMERIS_PATH = os.getenv("LOVEGURU_EPHEMERIS", "ephemeris.bin")
+DEFAULT_TZ = os.getenv("LOVEGURU_DEFAULT_TZ", "Asia/Kolkata")  # For places the gazetteer doesn't know
+FORMAT_VERSION = 1
+MAGIC = b"LGEP"
+HEADER = struct.Struct("<4sIddI")  # magic, version, first Julian day, step in days, rows
+FIRST_YEAR, LAST_YEAR = 1900, 2100
+STEP_DAYS = 0.5
+UNITS_PER_DEGREE = 65536 / 360  # Longitudes are stored as uint16
+UNIX_EPOCH_JD = 2440587.5
+J2000_JD = 2451545.0
+
+RASHIS = [
+    "Mesha", "Vrishabha", "Mithuna", "Karka", "Simha", "Kanya",
+    "Tula", "Vrishchika", "Dhanu", "Makara", "Kumbha", "Meena",
+]
+NAKSHATRAS = [
+    "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra", "Punarvasu", "Pushya", "Ashlesha",
+    "Magha", "Purva Phalguni", "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha",
+    "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
+    "Uttara Bhadrapada", "Revati",
+]
+NAKSHATRA_DEGREES = 360 / 27
+
+# Periodic terms of the moon's longitude (Meeus, Astronomical Algorithms, table 47.A), in 1e-6 degrees:
+# multiples of D (elongation), M (sun's anomaly), M' (moon's anomaly), F (argument of latitude)
+MOON_TERMS = [
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314), (0, 0, 2, 0, 213618),
+    (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332), (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066),
+    (2, 0, 1, 0, 53322), (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528), (0, 0, 1, -2, 10980),
+    (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034), (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888),
+    (2, 1, 0, 0, -6766), (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665), (0, 1, -2, 0, -2689),
+    (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390), (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236),
+    (0, 1, 2, 0, -2120), (0, 2, 0, 0, -2069), (2, -2, -1, 0, 2048), (2, 0, 1, -2, -1773),
+    (2, 0, 0, 2, -1595), (4, -1, -1, 0, 1215), (0, 0, 2, 2, -1110), (3, 0, -1, 0, -892),
+    (2, 1, 1, 0, -810), (4, -1, -2, 0, 759), (0, 2, -1, 0, -713), (2, 2, -1, 0, -700),
+    (2, 1, -2, 0, 691), (2, -1, 0, -2, 596), (4, 0, 1, 0, 549), (0, 0, 4, 0, 537),
+    (4, -1, 0, 0, 520), (1, 0, -2, 0, -487), (2, 1, 0, -2, -399), (0, 0, 2, -2, -381),
+    (1, 1, 1, 0, 351), (3, 0, -2, 0, -340), (4, 0, -3, 0, 330), (2, -1, 2, 0, 327),
+    (0, 2, 1, 0, -323), (1, 1, -1, 0, 299), (2, 0, 3, 0, 294),
+]
+
+
+# ========================= Astronomy (table build only) =========================
+# Apparent geocentric tropical longitudes in degrees for arrays of Julian days. UT is used for TT;
+# the difference (under 80s in this range) moves the moon by less than 0.01 degrees.
+
+
+def _nutation(t):
+    import numpy as np
+
+    return -0.00478 * np.sin(np.radians(125.04452 - 1934.136261 * t))
+
+
+def sun_longitude(jd):
+    import numpy as np
+
+    t = (jd - J2000_JD) / 36525
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t**2
+    anomaly = np.radians(357.52911 + 35999.05029 * t - 0.0001537 * t**2)
+    center = (
+        (1.914602 - 0.004817 * t - 0.000014 * t**2) * np.sin(anomaly)
+        + (0.019993 - 0.000101 * t) * np.sin(2 * anomaly)
+        + 0.000289 * np.sin(3 * anomaly)
+    )
+    return (mean_longitude + center - 0.00569 + _nutation(t)) % 360
+
+
+def moon_longitude(jd):
+    import numpy as np
+
+    t = (jd - J2000_JD) / 36525
+    mean_longitude = 218.3164477 + 481267.88123421 * t - 0.0015786 * t**2 + t**3 / 538841 - t**4 / 65194000
+    elongation = 297.8501921 + 445267.1114034 * t - 0.0018819 * t**2 + t**3 / 545868 - t**4 / 113065000
+    sun_anomaly = 357.5291092 + 35999.0502909 * t - 0.0001536 * t**2 + t**3 / 24490000
+    moon_anomaly = 134.9633964 + 477198.8675055 * t + 0.0087414 * t**2 + t**3 / 69699 - t**4 / 14712000
+    latitude_argument = 93.2720950 + 483202.0175233 * t - 0.0036539 * t**2 - t**3 / 3526000 + t**4 / 863310000
+    eccentricity = 1 - 0.002516 * t - 0.0000074 * t**2
+
+    total = np.zeros_like(t)
+    for d, m, m_prime, f, coefficient in MOON_TERMS:
+        argument = np.radians(d * elongation + m * sun_anomaly + m_prime * moon_anomaly + f * latitude_argument)
+        total += coefficient * eccentricity ** abs(m) * np.sin(argument)
+    total += (
+        3958 * np.sin(np.radians(119.75 + 131.849 * t))
+        + 1962 * np.sin(np.radians(mean_longitude - latitude_argument))
+        + 318 * np.sin(np.radians(53.09 + 479264.290 * t))
+    )
+    return (mean_longitude + total / 1e6 + _nutation(t)) % 360
+
+
+# Lahiri (Chitrapaksha) ayanamsa: 23°51'11" at J2000, precessing 50.28" a year
+def ayanamsa(jd):
+    return 23.85306 + 0.0139667 * (jd - J2000_JD) / 365.25
+
+
+def julian_days(utc):
+    import numpy as np
+
+    return np.asarray(utc, dtype="datetime64[s]").astype(np.float64) / 86400 + UNIX_EPOCH_JD
+
+
+# ========================= Ephemeris table =========================
+
+
+def build(path=EPHEMERIS_PATH, first_year=FIRST_YEAR, last_year=LAST_YEAR, step_days=STEP_DAYS):
+    import numpy as np
+
+    started = time.perf_counter()
+    first_jd, end_jd = julian_days(np.array([f"{first_year}-01-01", f"{last_year + 1}-01-01"], dtype="datetime64[s]"))
+    rows = int(round((end_jd - first_jd) / step_days)) + 1
+    jd = first_jd + np.arange(rows) * step_days
+    longitudes = np.stack([sun_longitude(jd), moon_longitude(jd)], axis=1)
+    table = (np.round(longitudes * UNITS_PER_DEGREE).astype(np.int64) % 65536).astype("<u2")
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, first_jd, step_days, rows))
+        f.write(table.tobytes())
+    os.replace(temp_path, path)
+    logger.info(
+        f"🌙 Ephemeris built: {rows} rows ({first_year}-{last_year}) in {time.perf_counter() - started:.2f}s",
+        extra={"event": "ephemeris_built", "rows": rows},
+    )
+    return path
+
+
+# (first Julian day, step, rows x [sun, moon] uint16 memmap), built first if missing
+@functools.lru_cache(maxsize=None)
+def load_table(path=EPHEMERIS_PATH):
+    import numpy as np
+
+    if not os.path.exists(path):
+        build(path)
+    with open(path, "rb") as f:
+        magic, version, first_jd, step_days, rows = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} ephemeris table")
+    return first_jd, step_days, np.memmap(path, dtype="<u2", mode="r", offset=HEADER.size, shape=(rows, 2))
+
+
+# Tropical (sun, moon) longitudes for arrays of Julian days, plus a mask of days inside the table
+def table_longitudes(jd, path=EPHEMERIS_PATH):
+    import numpy as np
+
+    first_jd, step_days, table = load_table(path)
+    position = (np.asarray(jd, dtype=np.float64) - first_jd) / step_days
+    inside = (position >= 0) & (position < len(table) - 1)
+    index = np.clip(np.floor(position), 0, len(table) - 2).astype(np.int64)
+    before = table[index].astype(np.float64)
+    after = table[index + 1].astype(np.float64)
+    # Both bodies only move forward, so the step is the forward difference mod 360 degrees
+    step = (after - before) % 65536
+    longitudes = (before + (position - index)[:, None] * step) / UNITS_PER_DEGREE % 360
+    return longitudes[:, 0], longitudes[:, 1], inside
+
+
+# ========================= Charts =========================
+
+
+# Minutes after midnight of an "HH:MM" time, None if it isn't one
+def parse_time(text):
+    try:
+        parsed = datetime.datetime.strptime(text.strip(), "%H:%M")
+    except ValueError:
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+
+# (minutes, known) arrays; each distinct time string is parsed once, unknown times become noon
+def _parse_times(times):
+    import numpy as np
+
+    values, inverse = np.unique(np.asarray(times, dtype=str), return_inverse=True)
+    minutes, known = np.full(len(values), 12 * 60, dtype=np.int64), np.zeros(len(values), dtype=bool)
+    for index, value in enumerate(values):
+        parsed = parse_time(value)
+        if parsed is not None:
+            minutes[index], known[index] = parsed, True
+    return minutes[inverse], known[inverse]
+
+
+def _zone(zone_name):
+    try:
+        return zoneinfo.ZoneInfo(zone_name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return zoneinfo.ZoneInfo(DEFAULT_TZ)
+
+
+# UTC offset in seconds of each local birth time; one lookup per distinct (zone, date), except on DST change days
+def _utc_offsets(local_dates, minutes, zones):
+    import numpy as np
+
+    zone_names, zone_rows = np.unique(np.asarray(zones, dtype=str), return_inverse=True)
+    offsets = np.zeros(len(local_dates), dtype=np.int64)
+    for zone_index, zone_name in enumerate(zone_names):
+        zone = _zone(zone_name)
+        rows = np.flatnonzero(zone_rows == zone_index)
+        dates, date_rows = np.unique(local_dates[rows], return_inverse=True)
+        date_offsets = np.zeros(len(dates), dtype=np.int64)
+        changing = []
+        for date_index, day in enumerate(dates.astype(datetime.date)):
+            start = datetime.datetime.combine(day, datetime.time(0, 0), zone).utcoffset()
+            end = datetime.datetime.combine(day, datetime.time(23, 59), zone).utcoffset()
+            date_offsets[date_index] = start.total_seconds()
+            if start != end:
+                changing.append(date_index)
+        offsets[rows] = date_offsets[date_rows]
+        for row in rows[np.isin(date_rows, changing)]:  # A DST change that day: look up each birth time
+            day = local_dates[row].astype(datetime.date)
+            local = datetime.datetime.combine(day, datetime.time(minutes[row] // 60, minutes[row] % 60), zone)
+            offsets[row] = local.utcoffset().total_seconds()
+    return offsets
+
+
+def _sidereal(jd):
+    import numpy as np
+
+    sun, moon, inside = table_longitudes(jd)
+    shift = ayanamsa(jd)
+    return np.mod(sun - shift, 360), np.mod(moon - shift, 360), inside
+
+
+# Vedic charts for parallel sequences of DD-MM-YYYY dates, "HH:MM" local times ("" when unknown, noon
+# is used) and IANA time zones. Returns numpy arrays: sun_rashi, moon_rashi, nakshatra (indices into
+# RASHIS / NAKSHATRAS, -1 when the date is invalid or outside the table), pada (1-4), and moon_certain:
+# False when the time is unknown and the moon changes rashi during that day.
+def vedic_batch(dobs, times, zones):
+    import numpy as np
+
+    dobs, times, zones = list(dobs), list(times), list(zones)
+    day, month, year, valid = parse_dobs(np.asarray(dobs, dtype=str))  # A str dtype even when empty
+    safe_year, safe_month, safe_day = np.where(valid, year, 2000), np.where(valid, month, 1), np.where(valid, day, 1)
+    local_dates = (
+        (safe_year - 1970).astype("datetime64[Y]")
+        + (safe_month - 1).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + (safe_day - 1).astype("timedelta64[D]")
+    minutes, known = _parse_times(times)
+    offsets = _utc_offsets(local_dates, minutes, zones)
+    local_midnight = local_dates.astype("datetime64[s]") - offsets.astype("timedelta64[s]")
+    jd = julian_days(local_midnight + (minutes * 60).astype("timedelta64[s]"))
+
+    sun, moon, inside = _sidereal(jd)
+    valid &= inside
+    nakshatra_position = moon / NAKSHATRA_DEGREES
+    # Without a birth time, the moon sign is only certain if it holds all day
+    _, day_start_moon, _ = _sidereal(julian_days(local_midnight))
+    _, day_end_moon, _ = _sidereal(julian_days(local_midnight + np.timedelta64(86399, "s")))
+    same_all_day = (day_start_moon // 30) == (day_end_moon // 30)
+    return {
+        "sun_rashi": np.where(valid, sun // 30, -1).astype(np.int8),
+        "moon_rashi": np.where(valid, moon // 30, -1).astype(np.int8),
+        "nakshatra": np.where(valid, nakshatra_position.astype(np.int64), -1).astype(np.int8),
+        "pada": np.where(valid, (nakshatra_position % 1 * 4).astype(np.int64) + 1, 0).astype(np.int8),
+        "moon_certain": valid & (known | same_all_day),
+    }
+
+
+def chart_names(charts, index):
+    if charts["sun_rashi"][index] < 0:
+        return {}
+    return {
+        "sun_rashi": RASHIS[charts["sun_rashi"][index]],
+        "moon_rashi": RASHIS[charts["moon_rashi"][index]],
+        "nakshatra": NAKSHATRAS[charts["nakshatra"][index]],
+        "pada": int(charts["pada"][index]),
+        "moon_certain": bool(charts["moon_certain"][index]),
+    }
+
+
+# One chart as names, {} when the date is invalid or outside the table
+def vedic_chart(dob, time_of_birth="", zone=DEFAULT_TZ):
+    return chart_names(vedic_batch([dob], [time_of_birth or ""], [zone or DEFAULT_TZ]), 0)
+
+
+# "Sun in Kumbha, Moon in Kanya, Hasta nakshatra (pada 1)" for prompts, "" for an empty chart
+def describe_chart(chart):
+    if not chart:
+        return ""
+    moon = f"Moon in {chart['moon_rashi']}" + ("" if chart["moon_certain"] else " (approximate, birth time unknown)")
+    return f"Sun in {chart['sun_rashi']}, {moon}, {chart['nakshatra']} nakshatra (pada {chart['pada']})"
+
+
+# Time zone of a gazetteer place id, DEFAULT_TZ when it is unknown
+def place_zone(place_id):
+    if not place_id:
+        return DEFAULT_TZ
+    import gazetteer
+
+    try:
+        place = gazetteer.get_gazetteer().by_id(place_id)
+    except (OSError, ValueError):
+        place = None
+    return place.tz if place else DEFAULT_TZ
+
+
+# ========================= Self-check and batch CLI =========================
+
+
+# Reference positions (Meeus examples 25.a and 47.a) and the worst table interpolation error over 1900-2100
+def check():
+    import numpy as np
+
+    checks = {
+        "sun 1992-10-13 (199.909)": abs(sun_longitude(np.array([2448908.5]))[0] - 199.9099) < 0.01,
+        "moon 1992-04-12 (133.167)": abs(moon_longitude(np.array([2448724.5]))[0] - 133.1673) < 0.01,
+    }
+    first_jd, step_days, table = load_table()
+    jd = first_jd + np.random.default_rng(7).uniform(0, (len(table) - 1) * step_days, 200_000)
+    sun, moon, _ = table_longitudes(jd)
+    sun_error = np.abs((sun - sun_longitude(jd) + 180) % 360 - 180).max()
+    moon_error = np.abs((moon - moon_longitude(jd) + 180) % 360 - 180).max()
+    checks[f"table sun error {sun_error:.4f}° < 0.01°"] = sun_error < 0.01
+    checks[f"table moon error {moon_error:.4f}° < 0.05°"] = moon_error < 0.05
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    return all(checks.values())
+
+
+# CSV in (dob, optional time_of_birth and place_of_birth, any other columns kept) -> CSV out with the chart
+def run_batch(input_path, output_path):
+    import gazetteer
+
+    started = time.perf_counter()
+    with open(input_path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    zones_by_place = {}
+    for place in {row.get("place_of_birth") or "" for row in rows}:
+        _, place_id = gazetteer.normalize_place(place)
+        zones_by_place[place] = place_zone(place_id)
+    charts = vedic_batch(
+        [(row.get("dob") or "").strip() for row in rows],
+        [row.get("time_of_birth") or "" for row in rows],
+        [zones_by_place[row.get("place_of_birth") or ""] for row in rows],
+    )
+    columns = ["sun_rashi", "moon_rashi", "nakshatra", "pada", "moon_certain"]
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=[*(rows[0].keys() if rows else []), *columns])
+        writer.writeheader()
+        for index, row in enumerate(rows):
+            writer.writerow({**row, **chart_names(charts, index)})
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(rows)} charts in {elapsed:.2f}s ({len(rows) / elapsed if elapsed else 0:,.0f}/s) -> {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vedic sun sign, moon sign and nakshatra")
+    parser.add_argument("--build", action="store_true", help="(re)build the ephemeris table")
+    parser.add_argument("--check", action="store_true", help="check reference positions and table accuracy")
+    parser.add_argument("--batch", nargs=2, metavar=("INPUT_CSV", "OUTPUT_CSV"))
+    parser.add_argument("--dob", help="DD-MM-YYYY, for a single chart")
+    parser.add_argument("--time", default="", help="HH:MM local time of birth")
+    parser.add_argument("--place", default="", help="place of birth")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.build:
+        build()
+    if args.check and not check():
+        raise SystemExit(1)
+    if args.batch:
+        run_batch(*args.batch)
+    if args.dob:
+        import gazetteer
+
+        print(vedic_chart(args.dob, args.time, place_zone(gazetteer.normalize_place(args.place)[1])))
+
+
+if __name__ == "__main__":
+    main()